@@ -0,0 +1,222 @@
+"""Build every style in many formats, optionally split into shards.
+
+A build is a list of :data:`Job`\\ s, each writing one style (or a variant of
+one, see :mod:`pygout.transform`) in one format.  Jobs are assigned to
+shards by a hash of the job, so any machine can work out which jobs are its
+own without coordinating with the others.  Each shard's output directory has
+a manifest recording the hash and build time of each of its outputs, and
+:func:`merge` combines the shards' outputs into one tree, checking that
+every job was built exactly once.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+from StringIO import StringIO
+
+import pygments
+
+from pygout.catalog import get_builtin_style
+from pygout.format import get_format
+
+
+#: A build job.  *variant* is the name of a transform preset, or ``None``.
+Job = namedtuple('Job', 'style format variant')
+
+#: Name of the manifest file in a build's output directory.
+MANIFEST = 'manifest.json'
+
+
+class MergeError(Exception):
+    """Shards couldn't be merged.  *problems* lists the reasons.
+    """
+    def __init__(self, problems):
+        Exception.__init__(self, '; '.join(problems))
+        self.problems = problems
+
+
+def make_jobs(styles, formats, variants=()):
+    """Get the jobs for building each of *styles* in each of *formats*, as
+    is and as each of *variants*, in a consistent order.
+    """
+    return sorted(Job(s, f, v) for s in styles for f in formats
+                  for v in (None,) + tuple(variants))
+
+
+def job_key(job):
+    """Get a string identifying *job*, e.g. ``monokai/vim`` or
+    ``monokai@darker/vim``.
+    """
+    if job.variant is None:
+        return '{}/{}'.format(job.style, job.format)
+    return '{}@{}/{}'.format(job.style, job.variant, job.format)
+
+
+def job_path(job):
+    """Get the path of *job*'s output, relative to the output directory.
+    """
+    name = job.style
+    if job.variant is not None:
+        name += '-' + job.variant
+    return os.path.join(job.format, name + get_format(job.format).extension)
+
+
+def shard_of(job, count):
+    """Get the (1-based) shard out of *count* that *job* belongs to.  This
+    only depends on the job, so is the same on every machine.
+    """
+    digest = hashlib.md5(job_key(job)).hexdigest()
+    return int(digest, 16) % count + 1
+
+
+def _jobs_digest(jobs):
+    """Identify a list of jobs, so that shards of different builds aren't
+    merged together.
+    """
+    return hashlib.sha256('\n'.join(job_key(j) for j in jobs)).hexdigest()
+
+
+def render(job):
+    """Build *job*, returning its output.
+    """
+    style = get_builtin_style(job.style)
+    if job.variant is not None:
+        from pygout.transform import PRESETS, transform_style
+        style = transform_style(style, PRESETS[job.variant],
+                                '{}-{}'.format(job.style, job.variant))
+    stream = StringIO()
+    get_format(job.format)().write(stream, style)
+    output = stream.getvalue()
+    if isinstance(output, unicode):
+        output = output.encode('utf-8')
+    return output
+
+
+def build(jobs, outdir, shard=1, count=1):
+    """Build the jobs in *jobs* that belong to shard number *shard* of
+    *count* into *outdir*, and write its manifest.  Returns the manifest.
+    """
+    assigned = [j for j in jobs if shard_of(j, count) == shard]
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    outputs = {}
+    for job in assigned:
+        start = time.time()
+        output = render(job)
+        path = job_path(job)
+        filename = os.path.join(outdir, path)
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        with open(filename, 'wb') as f:
+            f.write(output)
+        outputs[job_key(job)] = {
+            'path': path,
+            'sha256': hashlib.sha256(output).hexdigest(),
+            'seconds': round(time.time() - start, 6),
+        }
+
+    manifest = {
+        'pygments': pygments.__version__,
+        'shard': shard,
+        'shards': count,
+        'jobs': len(jobs),
+        'digest': _jobs_digest(jobs),
+        'assigned': [job_key(j) for j in assigned],
+        'outputs': outputs,
+    }
+    _write_manifest(os.path.join(outdir, MANIFEST), manifest)
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def _read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST), 'r') as f:
+        return json.load(f)
+
+
+def _check_output(directory, entry):
+    """Does the file for a manifest *entry* in *directory* match its hash?
+    """
+    try:
+        with open(os.path.join(directory, entry['path']), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest() == entry['sha256']
+    except IOError:
+        return False
+
+
+def merge(shard_dirs, outdir):
+    """Combine the outputs of the shard builds in *shard_dirs* into
+    *outdir*, with a manifest covering every job, and return the manifest.
+
+    Raises :exc:`MergeError` if the shards are from different builds, any
+    shard is missing, any job wasn't built, any output doesn't match its
+    manifest, or two shards built the same job differently.  Nothing is
+    written in that case.
+    """
+    manifests = []
+    problems = []
+    for d in shard_dirs:
+        try:
+            manifests.append((d, _read_manifest(d)))
+        except (IOError, ValueError) as e:
+            problems.append('{}: no manifest ({})'.format(d, e))
+    if not manifests:
+        raise MergeError(problems or ['no shards to merge'])
+
+    first = manifests[0][1]
+    for d, m in manifests:
+        for k in ('pygments', 'shards', 'jobs', 'digest'):
+            if m[k] != first[k]:
+                problems.append('{}: different {} from {}'.format(
+                    d, k, manifests[0][0]))
+    shards = set(m['shard'] for _, m in manifests)
+    for shard in range(1, first['shards'] + 1):
+        if shard not in shards:
+            problems.append('shard {}/{} is missing'.format(
+                shard, first['shards']))
+
+    outputs = {}
+    sources = {}
+    for d, m in manifests:
+        for key in m['assigned']:
+            if key not in m['outputs']:
+                problems.append('{}: {} was not built'.format(d, key))
+        for key, entry in sorted(m['outputs'].iteritems()):
+            if not _check_output(d, entry):
+                problems.append('{}: {} does not match the manifest'.format(
+                    d, entry['path']))
+            elif key in outputs and (outputs[key]['sha256'] !=
+                                     entry['sha256']):
+                problems.append('{}: {} conflicts with {}'.format(
+                    d, key, sources[key]))
+            else:
+                outputs[key] = entry
+                sources[key] = d
+    if not problems and len(outputs) != first['jobs']:
+        problems.append('{} of {} jobs were built'.format(
+            len(outputs), first['jobs']))
+    if problems:
+        raise MergeError(problems)
+
+    for key, entry in outputs.iteritems():
+        filename = os.path.join(outdir, entry['path'])
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        shutil.copyfile(os.path.join(sources[key], entry['path']), filename)
+
+    manifest = dict((k, first[k]) for k in ('pygments', 'jobs', 'digest'))
+    manifest.update({
+        'shard': 1,
+        'shards': 1,
+        'assigned': sorted(outputs),
+        'outputs': outputs,
+    })
+    _write_manifest(os.path.join(outdir, MANIFEST), manifest)
+    return manifest
@@ -0,0 +1,124 @@
+"""A snapshot of the built-in Pygments styles, for loading them quickly.
+
+Importing every :mod:`pygments.styles` module and resolving each style takes
+a noticeable amount of time, so :func:`snapshot` saves every style's
+definitions and resolved token table, tagged with the Pygments version, and
+:func:`load_catalog` rebuilds the styles from it without resolving them
+again.  The snapshot is regenerated automatically if the installed Pygments
+version is different, and skipped if the cache directory isn't usable.
+"""
+import json
+import os
+import threading
+
+import pygments
+from pygments.styles import get_all_styles, get_style_by_name
+
+from pygout.style import (Style, StyleMeta, TokenStyleEditor,
+                          create_style_from_pygments)
+from pygout.tokens import string_to_token
+from pygout.util import atomic_write, cache_dir
+
+
+def default_path():
+    return os.path.join(cache_dir(), 'catalog.json')
+
+
+def _dump_style(name):
+    style = get_style_by_name(name)
+    return {
+        'class': style.__name__,
+        'background_color': style.background_color,
+        'highlight_color': style.highlight_color,
+        'styles': dict((str(t), s) for t, s in style.styles.iteritems()),
+        'resolved': dict((str(t), s) for t, s in style._styles.iteritems()),
+    }
+
+
+def snapshot(path=None):
+    """Save a snapshot of all of the Pygments styles to *path* (default:
+    ``catalog.json`` in the cache directory), returning the path.
+    """
+    path = path or default_path()
+    data = {
+        'pygments': pygments.__version__,
+        'styles': dict((n, _dump_style(n)) for n in get_all_styles()),
+    }
+    with atomic_write(path) as f:
+        json.dump(data, f, sort_keys=True)
+    return path
+
+
+def _load_style(name, data):
+    """Rebuild a style like :func:`~pygout.style.create_style_from_pygments`
+    would create it, but without :class:`StyleMeta` resolving it again.
+    """
+    styles = dict((string_to_token(str(t)), s)
+                  for t, s in data['styles'].iteritems())
+    attrs = {
+        'background_color': data['background_color'],
+        'highlight_color': data['highlight_color'],
+        'styles': styles,
+        'pygout_name': name,
+        'pygout_styles': dict((t, TokenStyleEditor(s))
+                              for t, s in styles.iteritems() if s),
+        '_styles': dict((string_to_token(str(t)), s)
+                        for t, s in data['resolved'].iteritems()),
+    }
+    return type.__new__(StyleMeta, str(data['class']), (Style,), attrs)
+
+
+def _read_snapshot(path):
+    """Read the snapshot at *path*, or ``None`` if it's missing or corrupt.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        try:
+            return json.load(f)
+        except ValueError:
+            return None
+
+
+def load_catalog(path=None):
+    """Load the snapshot at *path* (default: see :func:`snapshot`),
+    returning a dict mapping style names to styles.  The snapshot is created
+    first if it doesn't exist, is corrupt or is for a different Pygments
+    version.  If it can't be read or written at all, the styles are created
+    from Pygments instead.
+    """
+    try:
+        path = path or default_path()
+        data = _read_snapshot(path)
+        if data is None or data.get('pygments') != pygments.__version__:
+            snapshot(path)
+            with open(path, 'r') as f:
+                data = json.load(f)
+        return dict((str(n), _load_style(n, s))
+                    for n, s in data['styles'].iteritems())
+    except (OSError, IOError, ValueError):
+        return dict((n, create_style_from_pygments(n))
+                    for n in get_all_styles())
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Like :func:`load_catalog`, but only loaded once, the first time this
+    is called from any thread.  The result, and the styles in it, must not
+    be modified.
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = load_catalog()
+        return _catalog
+
+
+def get_builtin_style(name):
+    """Get the Pygments style called *name* from :func:`get_catalog`,
+    raising :exc:`~exceptions.KeyError` if there isn't one.
+    """
+    return get_catalog()[name]
@@ -1,13 +1,14 @@
+import os
 import sys
 import argparse
 
 from pygments.styles import get_all_styles, get_style_by_name
 
-from pygout.format import find_formats
-from pygout.style import create_style_from_pygments
+from pygout.catalog import get_builtin_style
+from pygout.format import get_formats
 
 
-FORMATS = find_formats()
+FORMATS = get_formats()
 FORMAT_NAMES = sorted(FORMATS.keys())
 
 STYLE_NAMES = sorted(get_all_styles())
@@ -23,10 +24,330 @@ class _ListFormats(argparse.Action):
         parser.exit(0, '\n'.join(FORMAT_NAMES) + '\n')
 
 
+def load_style(source):
+    """Load a style from *source*, either a style definition file (a Vim
+    colorscheme if it ends with ``.vim``) or the name of a Pygments style.
+    """
+    if os.path.isfile(source):
+        if source.endswith('.vim'):
+            reader = FORMATS['vim']()
+        else:
+            reader = FORMATS['pygoutconfig']()
+        with open(source, 'r') as f:
+            return reader.read(f)
+    elif source in STYLE_NAMES:
+        return get_builtin_style(source)
+    else:
+        raise ValueError('no such file or Pygments style: ' + source)
+
+
+def _style_arg(source):
+    """argparse type for styles, see :func:`load_style`."""
+    try:
+        return load_style(source)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _color_arg(value):
+    """argparse type for colors."""
+    from pygout.util import normalise_color
+
+    try:
+        return normalise_color(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _token_color_arg(value):
+    """argparse type for ``TOKEN=COLOR`` search terms."""
+    from pygout.search import parse_token
+    from pygout.util import normalise_color
+
+    token, _, color = value.partition('=')
+    try:
+        return parse_token(token), normalise_color(color)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def search_main(argv):
+    from pygout.search import StyleIndex, load_default_index
+
+    parser = argparse.ArgumentParser(
+            prog='pygout search',
+            description='Find Pygments styles by color similarity')
+    parser.add_argument('-t', dest='colors', metavar='TOKEN=COLOR',
+                        action='append', type=_token_color_arg, default=[],
+                        help='Match the color of TOKEN (e.g. Keyword=#c678dd)')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--dark', dest='background', action='store_const',
+                       const='dark', help='Only styles with dark backgrounds')
+    group.add_argument('--light', dest='background', action='store_const',
+                       const='light',
+                       help='Only styles with light backgrounds')
+    group.add_argument('--background', dest='background', metavar='COLOR',
+                       type=_color_arg, help='Match the background color')
+    parser.add_argument('--like', metavar='STYLE', type=_style_arg,
+                        help='Find the styles most similar to STYLE (a file '
+                             'or Pygments style)')
+    parser.add_argument('-n', dest='count', metavar='N', type=int, default=5,
+                        help='Number of results (default: 5)')
+    parser.add_argument('--index', metavar='FILE',
+                        help='Use this index instead of the Pygments styles')
+    args = parser.parse_args(argv)
+
+    if args.index:
+        index = StyleIndex.load(args.index)
+    else:
+        index = load_default_index()
+
+    if args.like is not None:
+        results = index.similar(args.like, args.count)
+    else:
+        results = index.search(dict(args.colors), args.background,
+                               args.count)
+
+    for distance, name in results:
+        sys.stdout.write('{}\t{:.1f}\n'.format(name, distance))
+
+
+def _shard_arg(value):
+    """argparse type for ``K/N`` shards."""
+    try:
+        shard, count = [int(v) for v in value.split('/')]
+    except ValueError:
+        raise argparse.ArgumentTypeError('shard must be K/N, e.g. 2/4')
+    if not 1 <= shard <= count:
+        raise argparse.ArgumentTypeError('shard must be between 1 and N')
+    return shard, count
+
+
+def build_main(argv):
+    from pygout.build import build, make_jobs
+
+    parser = argparse.ArgumentParser(
+            prog='pygout build',
+            description='Write Pygments styles in many formats')
+    parser.add_argument('-S', dest='styles', metavar='STYLE',
+                        action='append', choices=STYLE_NAMES,
+                        help='Style to build (default: all styles)')
+    parser.add_argument('-f', dest='formats', metavar='FORMAT',
+                        action='append', choices=FORMAT_NAMES,
+                        help='Format to build (default: all formats)')
+    parser.add_argument('--variants', action='store_true',
+                        help='Also build every transform preset of each '
+                             'style (requires NumPy)')
+    parser.add_argument('--shard', metavar='K/N', type=_shard_arg,
+                        default=(1, 1),
+                        help='Only build the jobs for shard K of N')
+    parser.add_argument('-o', dest='outdir', metavar='DIR', required=True,
+                        help='Output directory')
+    args = parser.parse_args(argv)
+
+    variants = ()
+    if args.variants:
+        from pygout.transform import PRESETS
+        variants = sorted(PRESETS)
+    jobs = make_jobs(args.styles or STYLE_NAMES, args.formats or FORMAT_NAMES,
+                     variants)
+    shard, count = args.shard
+    manifest = build(jobs, args.outdir, shard, count)
+    sys.stderr.write('shard {}/{}: built {} of {} jobs\n'.format(
+        shard, count, len(manifest['outputs']), len(jobs)))
+
+
+def merge_main(argv):
+    from pygout.build import MergeError, merge
+
+    parser = argparse.ArgumentParser(
+            prog='pygout merge',
+            description='Combine the output of "pygout build --shard" '
+                        'runs, exiting with status 1 if any jobs are '
+                        'missing or conflict')
+    parser.add_argument('-o', dest='outdir', metavar='DIR', required=True,
+                        help='Output directory')
+    parser.add_argument('shards', metavar='SHARD_DIR', nargs='+',
+                        help='Output directory of a shard')
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = merge(args.shards, args.outdir)
+    except MergeError as e:
+        for problem in e.problems:
+            sys.stderr.write(problem + '\n')
+        return 1
+    sys.stderr.write('merged {} jobs\n'.format(len(manifest['outputs'])))
+    return 0
+
+
+def check_main(argv):
+    from pygout.formats.pygoutconfig import check_files
+    from pygout.util import find_files
+
+    parser = argparse.ArgumentParser(
+            prog='pygout check',
+            description='Validate style definition files, exiting with '
+                        'status 1 if any have errors')
+    parser.add_argument('--no-resolve', dest='resolve', action='store_false',
+                        help='Only check syntax and values, without '
+                             'resolving the styles')
+    parser.add_argument('-j', dest='processes', metavar='N', type=int,
+                        help='Number of worker processes')
+    parser.add_argument('paths', metavar='PATH', nargs='+',
+                        help='Style definition file, or directory to search '
+                             'for *.cfg files')
+    args = parser.parse_args(argv)
+
+    filenames = find_files(args.paths, '.cfg')
+    errors = check_files(filenames, args.resolve, args.processes)
+    for e in errors:
+        location = [e.path]
+        if e.section is not None:
+            location.append('[{}]'.format(e.section))
+        if e.key is not None:
+            location.append(e.key)
+        sys.stdout.write('{}: {}\n'.format(':'.join(location), e.message))
+    sys.stderr.write('{} errors in {} of {} files\n'.format(
+        len(errors), len(set(e.path for e in errors)), len(filenames)))
+    return 1 if errors else 0
+
+
+def coverage_main(argv):
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+    from pygout.coverage import TokenProfile
+
+    parser = argparse.ArgumentParser(
+            prog='pygout coverage',
+            description='Count the tokens lexers produce for sample code, '
+                        'writing a profile for --profile')
+    parser.add_argument('-l', dest='lexers', metavar='LEXER',
+                        action='append',
+                        help='Only lex files for LEXER (default: guess '
+                             'each lexer from the file name)')
+    parser.add_argument('-j', dest='processes', metavar='N', type=int,
+                        help='Number of worker processes')
+    parser.add_argument('paths', metavar='PATH', nargs='+',
+                        help='Sample source file or directory')
+    args = parser.parse_args(argv)
+
+    for alias in args.lexers or ():
+        try:
+            get_lexer_by_name(alias)
+        except ClassNotFound:
+            parser.error('unknown lexer: ' + alias)
+
+    profile = TokenProfile.build(args.paths, args.lexers, args.processes)
+    profile.save(sys.stdout)
+
+
+def diff_main(argv):
+    from pygout.diff import describe, diff_styles
+
+    parser = argparse.ArgumentParser(
+            prog='pygout diff',
+            description='Compare the effective styles of two styles, exiting '
+                        'with status 1 if they differ')
+    parser.add_argument('--emit', metavar='FORMAT', choices=FORMAT_NAMES,
+                        help='Write a patch turning OLD into NEW in FORMAT')
+    parser.add_argument('-q', dest='quiet', action='store_true',
+                        help="Don't list differences")
+    parser.add_argument('old', metavar='OLD', type=_style_arg,
+                        help='Style definition file or Pygments style')
+    parser.add_argument('new', metavar='NEW', type=_style_arg,
+                        help='Style definition file or Pygments style')
+    args = parser.parse_args(argv)
+
+    diff = diff_styles(args.old, args.new)
+    if args.emit:
+        FORMATS[args.emit]().write_patch(sys.stdout, args.new, diff)
+    elif not args.quiet:
+        for attr in ('background', 'highlight'):
+            if getattr(diff, attr):
+                sys.stdout.write('{}: {} -> {}\n'.format(
+                    attr, getattr(diff.old, attr + '_color'),
+                    getattr(diff.new, attr + '_color')))
+        for token in diff.tokens:
+            sys.stdout.write('{}: {} -> {}\n'.format(
+                token, describe(diff.old.find(token)),
+                describe(diff.new.find(token))))
+    return 1 if diff else 0
+
+
+def preview_main(argv):
+    from pygments.lexers import get_lexer_for_filename
+    from pygout.preview import contact_sheet, RENDERERS
+
+    parser = argparse.ArgumentParser(
+            prog='pygout preview',
+            description='Render sample code in many styles')
+    parser.add_argument('-S', dest='styles', metavar='STYLE',
+                        action='append', choices=STYLE_NAMES,
+                        help='Style to render (default: all styles)')
+    parser.add_argument('-l', dest='lexer', metavar='LEXER',
+                        help='Lexer to use (default: guess from file name)')
+    parser.add_argument('-o', dest='format', default='html',
+                        choices=sorted(RENDERERS.keys()),
+                        help='Output format (default: html)')
+    parser.add_argument('-j', dest='processes', metavar='N', type=int,
+                        help='Number of worker processes')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help="Don't use cached token streams")
+    parser.add_argument('samples', metavar='FILE', nargs='*',
+                        help='Sample source files')
+    args = parser.parse_args(argv)
+
+    samples = []
+    for filename in args.samples:
+        with open(filename, 'r') as f:
+            code = f.read().decode('utf-8')
+        if args.lexer:
+            lexer = args.lexer
+        else:
+            lexer = get_lexer_for_filename(filename).aliases[0]
+        samples.append((lexer, code))
+
+    output = contact_sheet(args.styles or STYLE_NAMES, samples, args.format,
+                           args.processes, args.cache)
+    sys.stdout.write(output.encode('utf-8'))
+
+
+def snapshot_main(argv):
+    from pygout.catalog import snapshot
+
+    parser = argparse.ArgumentParser(
+            prog='pygout snapshot',
+            description='Save a snapshot of the Pygments styles, so that '
+                        'they load quickly')
+    parser.add_argument('-o', dest='path', metavar='FILE',
+                        help='Snapshot file (default: in the cache '
+                             'directory)')
+    args = parser.parse_args(argv)
+
+    sys.stdout.write(snapshot(args.path) + '\n')
+
+
+#: Subcommands, which are run instead of the default format conversion
+COMMANDS = {
+    'build': build_main,
+    'check': check_main,
+    'coverage': coverage_main,
+    'diff': diff_main,
+    'merge': merge_main,
+    'preview': preview_main,
+    'search': search_main,
+    'snapshot': snapshot_main,
+}
+
+
 def main(argv=None):
     if argv is None:
         argv = sys.argv
 
+    if len(argv) > 1 and argv[1] in COMMANDS:
+        return COMMANDS[argv[1]](argv[2:])
+
     parser = argparse.ArgumentParser(
             description='Generate color schemes in different formats')
     parser.add_argument('--help-style', nargs=0, action=_ListStyles,
@@ -43,17 +364,27 @@ def main(argv=None):
     group.add_argument('-f', dest='style', metavar='FILE',
                        type=argparse.FileType('r'),
                        help='Use style definition file')
-    args = parser.parse_args()
+    parser.add_argument('--profile', metavar='FILE',
+                        type=argparse.FileType('r'),
+                        help='Only write tokens in this profile (from '
+                             '"pygout coverage"), most frequent first')
+    args = parser.parse_args(argv[1:])
 
     if args.pygments_style:
-        style = create_style_from_pygments(args.pygments_style)
+        style = get_builtin_style(args.pygments_style)
     elif args.style:
         reader = FORMATS['pygoutconfig']()
         style = reader.read(args.style)
 
     writer = FORMATS[args.format]()
+    if args.profile:
+        if not writer.uses_profile:
+            parser.error("the {} format doesn't support --profile".format(
+                args.format))
+        from pygout.coverage import TokenProfile
+        writer.profile = TokenProfile.load(args.profile)
     writer.write(sys.stdout, style)
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Conversion between style formats which is safe to use from many threads at
+once.
+
+Nothing here modifies global state: every call uses its own :class:`Format`
+instances, styles are created afresh, and writers only see the immutable
+:class:`~pygout.style.ResolvedStyle` view of them.
+"""
+from StringIO import StringIO
+
+from pygout.format import get_format
+from pygout.style import create_style_from_pygments
+
+
+def read_style(stream, format):
+    """Read a style from *stream* using the format named *format*.
+    """
+    return get_format(format)().read(stream)
+
+
+def write_style(style, format, **options):
+    """Write *style* using the format named *format*, returning the output
+    as a string.  *options* are passed to the format's constructor.
+    """
+    stream = StringIO()
+    get_format(format)(**options).write(stream, style)
+    return stream.getvalue()
+
+
+def convert(stream, from_format, to_format, **options):
+    """Read a style from *stream* in *from_format* and return it written in
+    *to_format*.
+    """
+    return write_style(read_style(stream, from_format), to_format, **options)
+
+
+def convert_pygments(name, to_format, **options):
+    """Return the Pygments style called *name* written in *to_format*.
+    """
+    return write_style(create_style_from_pygments(name), to_format, **options)
+
+
+def convert_iter(instream, from_format, outstream, to_format, **options):
+    """Convert a style from *instream* in *from_format* to *outstream* in
+    *to_format*, passing ``(token, TokenStyleEditor)`` pairs directly from
+    the reader to the writer.
+
+    If both formats support streaming (see :meth:`Format.read_iter` and
+    :meth:`Format.write_iter`) the style is never held in memory all at
+    once.  Only token styles are passed along, so style-wide settings such
+    as the background color are lost.
+    """
+    reader = get_format(from_format)()
+    writer = get_format(to_format)(**options)
+    writer.write_iter(outstream, reader.read_iter(instream))
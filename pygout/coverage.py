@@ -0,0 +1,123 @@
+"""Profile which token types lexers actually produce for a body of code.
+
+A :class:`TokenProfile` counts the tokens found by lexing sample source
+files.  Writers given a profile (see :attr:`pygout.format.Format.profile`)
+can leave out rules for tokens that never appear and put the most common
+tokens first.
+"""
+import json
+import os
+from fnmatch import fnmatch
+from multiprocessing import Pool
+
+from pygments.lexers import get_lexer_by_name, get_lexer_for_filename
+from pygments.token import string_to_tokentype
+from pygments.util import ClassNotFound
+
+from pygout.util import find_files
+
+
+class TokenProfile(object):
+    """Token type frequencies, from a dict mapping tokens to counts.
+    """
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+        # Counts including subtypes, for every token that's reachable
+        self._totals = {}
+        for token, count in self.counts.iteritems():
+            while token is not None:
+                self._totals[token] = self._totals.get(token, 0) + count
+                token = token.parent
+
+    def reachable(self, token):
+        """Can the style of *token* affect anything, i.e. did *token* or any
+        of its subtypes appear?
+        """
+        return token in self._totals
+
+    def frequency(self, token):
+        """Get the number of times *token* or any of its subtypes appeared.
+        """
+        return self._totals.get(token, 0)
+
+    def select(self, items, key=lambda item: item[0]):
+        """Filter *items*, where *key* gets the token for each item, to the
+        reachable ones, most frequent first.  Items with the same frequency
+        stay in their original order.
+        """
+        items = [i for i in items if self.reachable(key(i))]
+        items.sort(key=lambda i: -self.frequency(key(i)))
+        return items
+
+    @classmethod
+    def build(cls, paths, lexers=None, processes=None):
+        """Profile the files in *paths* (searching any directories) using a
+        pool of *processes* worker processes (default: one per CPU).
+
+        If *lexers* is given, only files matching the filename patterns of
+        those lexers (by alias) are lexed.  Otherwise each file's lexer is
+        guessed from its name, and files without one are skipped.
+        """
+        filenames = find_files(paths)
+        pool = Pool(processes)
+        try:
+            results = pool.map(_count_file,
+                               [(f, lexers) for f in filenames],
+                               chunksize=16)
+        finally:
+            pool.close()
+            pool.join()
+
+        counts = {}
+        for result in results:
+            _add_counts(counts, dict((string_to_tokentype(str(t)), n)
+                                     for t, n in result.iteritems()))
+        return cls(counts)
+
+    def save(self, stream):
+        json.dump(dict((str(t), n) for t, n in self.counts.iteritems()),
+                  stream, sort_keys=True, indent=0)
+        stream.write('\n')
+
+    @classmethod
+    def load(cls, stream):
+        return cls(dict((string_to_tokentype(str(t)), n)
+                        for t, n in json.load(stream).iteritems()))
+
+
+def _add_counts(counts, more):
+    for token, n in more.iteritems():
+        counts[token] = counts.get(token, 0) + n
+    return counts
+
+
+def _find_lexer(filename, lexers):
+    """Get a lexer for *filename*, from *lexers* if given, or ``None``.
+    """
+    basename = os.path.basename(filename)
+    if lexers is None:
+        try:
+            return get_lexer_for_filename(basename)
+        except ClassNotFound:
+            return None
+    for alias in lexers:
+        lexer = get_lexer_by_name(alias)
+        if any(fnmatch(basename, p) for p in lexer.filenames):
+            return lexer
+    return None
+
+
+def _count_file(args):
+    """Worker for :meth:`TokenProfile.build`.  Tokens lose their identity
+    when pickled, so counts are returned by token name.
+    """
+    filename, lexers = args
+    lexer = _find_lexer(filename, lexers)
+    if lexer is None:
+        return {}
+    with open(filename, 'rb') as f:
+        code = f.read().decode('utf-8', 'replace')
+    counts = {}
+    for token, _ in lexer.get_tokens(code):
+        counts[str(token)] = counts.get(str(token), 0) + 1
+    return counts
@@ -0,0 +1,66 @@
+"""Compare styles by their resolved token styles.
+"""
+from pygout.style import ResolvedStyle
+from pygout.tokens import sort_tokens
+
+
+def _resolved(style):
+    if isinstance(style, ResolvedStyle):
+        return style
+    return ResolvedStyle(style)
+
+
+class StyleDiff(object):
+    """The differences between the effective styles of two styles.
+
+    *tokens* is the sorted list of tokens whose
+    :class:`~pygout.style.TokenStyle` differs, and *background* and
+    *highlight* are true if those colors differ.  A diff is false if the
+    styles are equivalent.
+    """
+    def __init__(self, old, new):
+        self.old = _resolved(old)
+        self.new = _resolved(new)
+        self.background = (self.old.background_color !=
+                           self.new.background_color)
+        self.highlight = self.old.highlight_color != self.new.highlight_color
+
+        tokens = set(t for t, _ in self.old)
+        tokens.update(t for t, _ in self.new)
+        self.tokens = sort_tokens(t for t in tokens if self.changed(t))
+
+    def changed(self, token):
+        """Does the effective style of *token* differ?
+        """
+        return self.old.find(token) != self.new.find(token)
+
+    def __nonzero__(self):
+        return bool(self.tokens or self.background or self.highlight)
+
+
+def describe(tokenstyle):
+    """Describe a :class:`~pygout.style.TokenStyle` like a Pygments style
+    string.
+    """
+    parts = [a for a in ('bold', 'italic', 'underline')
+             if getattr(tokenstyle, a)]
+    if tokenstyle.color:
+        parts.append(tokenstyle.color)
+    if tokenstyle.bgcolor:
+        parts.append('bg:' + tokenstyle.bgcolor)
+    if tokenstyle.border:
+        parts.append('border:' + tokenstyle.border)
+    return ' '.join(parts) or '(none)'
+
+
+def diff_styles(old, new):
+    """Compare two styles (or :class:`~pygout.style.ResolvedStyle`\\ s),
+    returning a :class:`StyleDiff`.
+    """
+    return StyleDiff(old, new)
+
+
+def styles_equivalent(a, b):
+    """Do two styles render every token identically?
+    """
+    return not StyleDiff(a, b)
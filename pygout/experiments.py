@@ -10,7 +10,6 @@ def get_token_style(style, token):
     for t in hierarchy:
         if style.styles_token(t):
             return style.style_for_token(t)
-StyleMeta.find_style_for_token = get_token_style
 
 
 def newstyle(default, styles_):
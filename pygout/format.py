@@ -1,7 +1,21 @@
+import threading
+
 from straight.plugin import load as plugin_load
 
+from pygout.style import create_style, iter_style
+
 
 class Format(object):
+    #: A :class:`~pygout.coverage.TokenProfile`, or ``None``.  Writers which
+    #: support profiles leave out tokens it never saw and write the most
+    #: frequent tokens first.
+    profile = None
+    #: Does the writer use :attr:`profile`?
+    uses_profile = False
+
+    #: File name extension for files written in this format.
+    extension = '.txt'
+
     @classmethod
     def name(cls):
         """Get the format's name.
@@ -33,6 +47,37 @@ class Format(object):
         """
         raise NotImplementedError
 
+    def write_patch(self, stream, style, diff):
+        """Write only what needs to change to turn the style *diff* was
+        created from into *style*, where *diff* is a
+        :class:`~pygout.diff.StyleDiff`.
+
+        By default this writes the whole style with :meth:`write`, which is
+        always a correct (if not minimal) patch.
+        """
+        self.write(stream, style)
+
+    def read_iter(self, stream):
+        """Read token styles from *stream* according to the format, yielding
+        ``(token, TokenStyleEditor)`` pairs.
+
+        Formats which can produce token styles without reading the whole
+        stream first should override this; by default the whole style is
+        read with :meth:`read`.
+        """
+        return iter_style(self.read(stream))
+
+    def write_iter(self, stream, styles):
+        """Write the ``(token, TokenStyleEditor)`` pairs from the iterable
+        *styles* to *stream* according to the format.
+
+        Formats which can write token styles as they arrive, without needing
+        the rest of the style, should override this; by default all of the
+        pairs are collected with :func:`~pygout.style.create_style` and
+        written with :meth:`write`.
+        """
+        self.write(stream, create_style(None, dict(styles)))
+
 
 class PluginError(Exception):
     pass
@@ -51,3 +96,26 @@ def find_formats():
             formats[p.name()] = p
 
     return formats
+
+
+_formats = None
+_formats_lock = threading.Lock()
+
+
+def get_formats():
+    """Like :func:`find_formats`, but the plugins are only loaded once, the
+    first time this is called from any thread.  The result must not be
+    modified.
+    """
+    global _formats
+    with _formats_lock:
+        if _formats is None:
+            _formats = find_formats()
+        return _formats
+
+
+def get_format(name):
+    """Get the :class:`Format` subclass called *name*, raising
+    :exc:`~exceptions.KeyError` if there isn't one.
+    """
+    return get_formats()[name]
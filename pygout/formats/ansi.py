@@ -0,0 +1,170 @@
+import json
+import os
+
+from pygments.token import Token, string_to_tokentype
+
+from pygout.format import Format
+from pygout.style import ResolvedStyle
+from pygout.util import color_to_lab, color_to_rgb
+
+
+#: Color depths, in the order they are stored in the table.
+DEPTHS = ('truecolor', '256', '16')
+
+#: The usual xterm colors for the 16 basic SGR colors.
+ANSI_16_COLORS = [
+    '#000000', '#cd0000', '#00cd00', '#cdcd00',
+    '#0000ee', '#cd00cd', '#00cdcd', '#e5e5e5',
+    '#7f7f7f', '#ff0000', '#00ff00', '#ffff00',
+    '#5c5cff', '#ff00ff', '#00ffff', '#ffffff',
+]
+
+_CUBE_LEVELS = [0, 95, 135, 175, 215, 255]
+
+#: The xterm 256-color palette entries above 15 (6x6x6 color cube, then 24
+#: grays); the first 16 vary between terminals so aren't used.
+ANSI_256_COLORS = dict(
+    [(16 + 36 * r + 6 * g + b, '#%02x%02x%02x' % (
+        _CUBE_LEVELS[r], _CUBE_LEVELS[g], _CUBE_LEVELS[b]))
+     for r in range(6) for g in range(6) for b in range(6)] +
+    [(232 + i, '#%02x%02x%02x' % ((8 + 10 * i,) * 3)) for i in range(24)])
+
+_LAB_16 = [(i, color_to_lab(c)) for i, c in enumerate(ANSI_16_COLORS)]
+_LAB_256 = [(i, color_to_lab(c)) for i, c in ANSI_256_COLORS.iteritems()]
+
+
+def _nearest(color, palette):
+    """Find the index of the entry in *palette*, a list of ``(index, lab)``
+    pairs, perceptually closest to *color*.
+    """
+    lab = color_to_lab(color)
+    return min(palette,
+               key=lambda p: sum((a - b) ** 2 for a, b in zip(lab, p[1])))[0]
+
+
+def _color_params(color, depth, background):
+    if depth == 'truecolor':
+        return '{};2;{};{};{}'.format(48 if background else 38,
+                                      *color_to_rgb(color))
+    elif depth == '256':
+        return '{};5;{}'.format(48 if background else 38,
+                                _nearest(color, _LAB_256))
+    else:
+        i = _nearest(color, _LAB_16)
+        base = 40 if background else 30
+        return str(base + i if i < 8 else base + 60 + i - 8)
+
+
+def sgr(tokenstyle, depth='truecolor', bgcolor=None):
+    """Get the SGR escape sequence for a :class:`~pygout.style.TokenStyle`
+    at a color *depth* (one of :data:`DEPTHS`).  The sequence starts by
+    resetting all attributes, so doesn't depend on what came before it.
+    *bgcolor* is used if the token has no background color.
+    """
+    params = ['0']
+    if tokenstyle.bold:
+        params.append('1')
+    if tokenstyle.italic:
+        params.append('3')
+    if tokenstyle.underline:
+        params.append('4')
+    if tokenstyle.color:
+        params.append(_color_params(tokenstyle.color, depth, False))
+    bgcolor = tokenstyle.bgcolor or bgcolor
+    if bgcolor:
+        params.append(_color_params(bgcolor, depth, True))
+    return '\x1b[{}m'.format(';'.join(params))
+
+
+#: Escape sequence to reset all attributes.
+RESET = '\x1b[0m'
+
+
+class Ansi(Format):
+    """Write a table of terminal escape sequences for each token, for use
+    with :class:`SgrTable`.
+
+    The table is JSON: *styles* is a list of distinct ``[truecolor, 256,
+    16]`` escape sequence triples and *tokens* maps token names to indices
+    into it.
+    """
+    extension = '.json'
+
+    def write(self, stream, style):
+        resolved = ResolvedStyle(style)
+        styles = []
+        indices = {}
+        tokens = {}
+        for token, tokenstyle in resolved:
+            if tokenstyle not in indices:
+                indices[tokenstyle] = len(styles)
+                styles.append([sgr(tokenstyle, d) for d in DEPTHS])
+            tokens[str(token)] = indices[tokenstyle]
+
+        json.dump({'name': resolved.name, 'styles': styles, 'tokens': tokens},
+                  stream, sort_keys=True, separators=(',', ':'))
+        stream.write('\n')
+
+
+def detect_depth(environ=os.environ):
+    """Guess the color depth of the terminal from environment variables.
+    """
+    if environ.get('COLORTERM') in ('truecolor', '24bit'):
+        return 'truecolor'
+    elif '256' in environ.get('TERM', ''):
+        return '256'
+    else:
+        return '16'
+
+
+class SgrTable(object):
+    """Highlight token streams using a table written by :class:`Ansi`.
+
+    All escape sequences are rendered in advance, so highlighting is only a
+    dict lookup per token.
+    """
+    def __init__(self, sequences):
+        #: Token -> escape sequence
+        self.sequences = sequences
+
+    @classmethod
+    def load(cls, stream, depth=None):
+        """Load the table for *depth* (one of :data:`DEPTHS`, default
+        :func:`detect_depth`) from *stream*.
+        """
+        column = DEPTHS.index(depth or detect_depth())
+        data = json.load(stream)
+        styles = [s[column] for s in data['styles']]
+        return cls(dict((string_to_tokentype(str(name)), styles[i])
+                        for name, i in data['tokens'].iteritems()))
+
+    def __getitem__(self, token):
+        sequence = self.sequences.get(token)
+        if sequence is None:
+            # Subtypes not in the table share their parent's sequence
+            if token is Token or token.parent is None:
+                sequence = RESET
+            else:
+                sequence = self[token.parent]
+            self.sequences[token] = sequence
+        return sequence
+
+    def highlight(self, tokens):
+        """Generate highlighted strings from an iterable of ``(token,
+        text)`` pairs, like :meth:`pygments.lexer.Lexer.get_tokens`
+        produces.
+        """
+        sequences = self.sequences
+        last = None
+        for token, text in tokens:
+            sequence = sequences.get(token) or self[token]
+            if sequence != last:
+                yield sequence
+                last = sequence
+            yield text
+        yield RESET
+
+    def format(self, tokens):
+        """Highlight *tokens*, returning a single string.
+        """
+        return ''.join(self.highlight(tokens))
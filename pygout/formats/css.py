@@ -0,0 +1,200 @@
+from pygments.token import Token, STANDARD_TYPES
+
+from pygout.format import Format
+from pygout.style import ResolvedStyle
+
+
+class Css(Format):
+    """Write a style as a CSS stylesheet for Pygments' HTML markup.
+
+    Unlike Pygments' own :meth:`HtmlFormatter.get_style_defs`, tokens with
+    identical declarations are grouped into a single rule.  If *variables* is
+    true, colors used by more than one rule are hoisted into CSS custom
+    properties on the *prefix* rule.  If *changed_only* is true, only tokens
+    whose effective style differs from their parent's are emitted, which is
+    only correct for markup where each token also carries its ancestors'
+    classes (e.g. ``<span class="k kd">``).
+    """
+    extension = '.css'
+
+    def __init__(self, prefix='.highlight', variables=False,
+                 changed_only=False):
+        self.prefix = prefix
+        self.variables = variables
+        self.changed_only = changed_only
+
+    def write(self, stream, style):
+        resolved = ResolvedStyle(style)
+        declarations = dict((t, _declarations(s)) for t, s in resolved)
+
+        if self.changed_only:
+            declarations = self._changed_declarations(resolved, declarations)
+        rules = _group_rules(declarations, by_depth=self.changed_only)
+
+        base = []
+        if resolved.background_color:
+            base.append(('background', resolved.background_color))
+        base.extend(_base_declarations(declarations))
+
+        variables = {}
+        if self.variables:
+            shared = _shared_colors([base] + [d for d, _ in rules])
+            variables = dict((c, '--pygout-color-{}'.format(i))
+                             for i, c in enumerate(shared))
+            base[:0] = [(variables[c], c) for c in shared]
+
+        stream.write(self._rule([self.prefix], base, variables))
+        if resolved.highlight_color:
+            stream.write('{} .hll {{ background-color: {} }}\n'.format(
+                self.prefix, resolved.highlight_color))
+        self._write_rules(stream, rules, variables)
+
+    def _changed_declarations(self, resolved, declarations):
+        """Keep only the tokens whose declarations differ from their
+        parent's.  Properties the parent sets but the token doesn't are
+        given their initial values, so that the parent's rule doesn't apply
+        them to the token.
+        """
+        changed = {}
+        for t, d in declarations.iteritems():
+            parent = declarations.get(t.parent)
+            if t.parent is None:
+                changed[t] = d
+            elif parent != d:
+                props = set(p for p, _ in d + parent)
+                changed[t] = tuple(
+                    (p, v) for p, v in _declarations(resolved[t], True)
+                    if p in props)
+        return changed
+
+    def write_patch(self, stream, style, diff):
+        """Write rules for only the tokens whose effective styles changed.
+        Every property is given, so that the rules override the old ones
+        when appended to the old stylesheet.  Custom properties aren't used.
+        """
+        resolved = ResolvedStyle(style)
+        declarations = dict((t, _declarations(resolved.find(t), True))
+                            for t in diff.tokens)
+
+        if diff.background or any(not _css_class(t) for t in declarations):
+            base = [('background', resolved.background_color or 'none')]
+            # The base token's background is the background
+            base.extend(d for d in _base_declarations(declarations)
+                        if d != ('background-color', 'transparent'))
+            stream.write(self._rule([self.prefix], base, {}))
+        if diff.highlight:
+            stream.write('{} .hll {{ background-color: {} }}\n'.format(
+                self.prefix, resolved.highlight_color or 'transparent'))
+        self._write_rules(stream, _group_rules(declarations), {})
+
+    def _write_rules(self, stream, rules, variables):
+        for decls, tokens in rules:
+            selectors = ['{} .{}'.format(self.prefix, _css_class(t))
+                         for t in tokens]
+            stream.write(self._rule(selectors, decls, variables))
+
+    def _rule(self, selectors, decls, variables):
+        body = '; '.join('{}: {}'.format(k, _var(v, k, variables))
+                         for k, v in decls)
+        return '{} {{ {} }}\n'.format(', '.join(selectors), body)
+
+
+def _css_class(token):
+    """Get the CSS class Pygments' HTML formatter uses for *token*.
+    """
+    name = STANDARD_TYPES.get(token)
+    suffix = ''
+    while name is None:
+        suffix = '-' + token[-1] + suffix
+        token = token.parent
+        name = STANDARD_TYPES.get(token)
+    return name + suffix
+
+
+def _base_declarations(declarations):
+    """Merge the declarations of the tokens without a CSS class of their own
+    (:const:`~pygments.token.Token` and ``Token.Text``), which are styled by
+    the prefix rule.  Deeper tokens' values win.
+    """
+    merged = []
+    tokens = [t for t in declarations if not _css_class(t)]
+    for token in sorted(tokens, key=len):
+        for prop, value in declarations[token]:
+            merged = [d for d in merged if d[0] != prop]
+            merged.append((prop, value))
+    return merged
+
+
+def _group_rules(declarations, by_depth=False):
+    """Group the tokens in *declarations*, a map of tokens to declarations,
+    into ``(declarations, tokens)`` rules.  Tokens styled by the prefix rule
+    itself, and those without declarations, are skipped.
+
+    If *by_depth* is true, only tokens at the same depth are grouped, so
+    that every rule comes after the rules of its tokens' ancestors.  This is
+    needed when a token's rule must override its parent's.
+    """
+    groups = {}
+    for token, decls in declarations.iteritems():
+        if decls and _css_class(token):
+            key = (len(token), decls) if by_depth else decls
+            groups.setdefault(key, (decls, []))[1].append(token)
+
+    # Order rules by hierarchy, like Pygments does, so that parent rules
+    # come first
+    rules = [(decls, sorted(tokens, key=lambda t: (len(t), t)))
+             for decls, tokens in groups.itervalues()]
+    rules.sort(key=lambda r: (len(r[1][0]), r[1][0]))
+    return rules
+
+
+def _declarations(tokenstyle, explicit=False):
+    """Convert a :class:`~pygout.style.TokenStyle` to a tuple of CSS
+    declarations.  If *explicit* is true, properties which aren't set are
+    given their initial values rather than left out.
+    """
+    def decl(prop, value, initial):
+        if value:
+            decls.append((prop, value))
+        elif explicit:
+            decls.append((prop, initial))
+
+    decls = []
+    decl('color', tokenstyle.color, 'inherit')
+    decl('font-weight', tokenstyle.bold and 'bold', 'normal')
+    decl('font-style', tokenstyle.italic and 'italic', 'normal')
+    decl('text-decoration', tokenstyle.underline and 'underline', 'none')
+    decl('background-color', tokenstyle.bgcolor, 'transparent')
+    decl('border', tokenstyle.border and '1px solid ' + tokenstyle.border,
+         'none')
+    return tuple(decls)
+
+
+def _color(value):
+    """Get the color at the end of a declaration value, or None.
+    """
+    color = value.rsplit(' ', 1)[-1]
+    return color if color.startswith('#') else None
+
+
+def _shared_colors(rules):
+    """Get the colors used by more than one of *rules*, most frequently used
+    first.
+    """
+    counts = {}
+    for decls in rules:
+        for k, v in decls:
+            color = _color(v)
+            if color is not None:
+                counts[color] = counts.get(color, 0) + 1
+    return sorted((c for c, n in counts.iteritems() if n > 1),
+                  key=lambda c: (-counts[c], c))
+
+
+def _var(value, prop, variables):
+    """Substitute a custom property reference for the color in *value*.
+    """
+    color = _color(value)
+    if prop.startswith('--') or color not in variables:
+        return value
+    return value[:-len(color)] + 'var({})'.format(variables[color])
@@ -1,42 +1,309 @@
-from configparser import ConfigParser, ExtendedInterpolation
+import os
+import re
+import threading
+from collections import namedtuple
+from multiprocessing import Pool
 
-from pygments.token import string_to_tokentype
+import configparser
+from configparser import ConfigParser, ExtendedInterpolation
 
 from pygout.format import Format
-from pygout.style import TokenStyleEditor, create_style
+from pygout.style import ResolvedStyle, TokenStyleEditor, create_style
+from pygout.style import iter_style
+from pygout.tokens import string_to_token
+
+
+#: Options of a token style section which take boolean values.
+BOOLEAN_OPTIONS = ('inherit', 'bold', 'italic', 'underline')
+#: Options of a token style section which take colors.
+COLOR_OPTIONS = ('color', 'bgcolor', 'border')
+
+#: A problem found by :meth:`PygOutConfig.validate`.  *section* and *key*
+#: are ``None`` if the problem isn't specific to one.
+ConfigError = namedtuple('ConfigError', 'path section key message')
+
+#: Section for directives, rather than styles.
+DIRECTIVE_SECTION = 'pygout'
 
 
 class PygOutConfig(Format):
+    """Style definitions in INI format, one section per token.
+
+    The ``[pygout]`` section can name other files to merge in, relative to
+    the file being read: ``include`` merges in every section, e.g. a base
+    style, and ``palette`` only merges in the non-token sections, e.g. a
+    shared ``[palette]``.  Options in the file itself override the included
+    ones, and references are interpolated after merging.
+    """
+    extension = '.cfg'
+    uses_profile = True
+
+    def __init__(self, profile=None):
+        self.profile = profile
+
     def read(self, stream):
         config = self._create_configparser()
         config.read_file(stream)
+        config = _merge_includes(config, stream)
 
         token_styles = {}
         for name, section in config.items():
             # Ignore sections that aren't going to be allowed as token names
-            if name == 'IGNORED_DEFAULT' or name[0].islower():
+            if not _is_token_section(name):
                 continue
 
-            token = string_to_tokentype(name)
+            token = _section_token(name)
             token_styles[token] = _read_style_section(section)
 
         # TODO: handle background, highlight colors
-        # TODO: save palette?
         # TODO: have a style name?
+        # TODO: keep palettes, so write() can reference them
         return create_style(None, token_styles)
 
-    def write(self, stream, style):
-        styles = style.pygout_styles
+    def read_iter(self, stream):
+        """Read token styles from *stream* one section at a time, without
+        keeping previous token sections.
+
+        Values can only be interpolated from the same section or from
+        non-token sections (e.g. ``[palette]``) that appear before it.  The
+        ``[pygout]`` section, if any, must be the first section.  Included
+        token sections which aren't in *stream* are read last.
+        """
+        context = self._create_configparser()
+        included = {}
+        first = True
+        for name, lines in _iter_sections(stream):
+            if name == DIRECTIVE_SECTION:
+                if not first:
+                    raise ValueError('[{}] must be the first section'.format(
+                        DIRECTIVE_SECTION))
+                context.read_file(iter(lines))
+                included = _includes(context, stream)[0]
+                context.read_dict(dict((k, v) for k, v in included.iteritems()
+                                       if not _is_token_section(k)))
+                included = dict((k, v) for k, v in included.iteritems()
+                                if _is_token_section(k))
+                continue
+            first = False
+
+            if not _is_token_section(name):
+                context.read_file(iter(lines))
+                continue
+
+            if name in included:
+                context.read_dict({name: included.pop(name)})
+            context.read_file(iter(lines))
+            yield self._pop_token_style(context, name)
+
+        for name in sorted(included):
+            context.read_dict({name: included[name]})
+            yield self._pop_token_style(context, name)
+
+    def _pop_token_style(self, context, name):
+        try:
+            style = _read_style_section(context[name])
+        finally:
+            context.remove_section(name)
+        return _section_token(name), style
+
+    def validate(self, stream, resolve=True, path=None):
+        """Check a style definition for errors, returning a list of
+        :data:`ConfigError`\\ s (tagged with *path*).  Unlike :meth:`read`,
+        every section and option is checked instead of stopping at the first
+        error.
+
+        If *resolve* is false the style isn't created and resolved, only the
+        syntax and values are checked.
+        """
         config = self._create_configparser()
-        for token in sorted(styles.keys()):
-            token_name = str(token)
-            config.add_section(token_name)
-            _write_style_section(config[token_name], styles[token])
-        config.write(stream, space_around_delimiters=True)
+        try:
+            config.read_file(stream)
+        except configparser.Error as e:
+            # Nothing more can be checked without a parsed file
+            return [ConfigError(path, getattr(e, 'section', None),
+                                getattr(e, 'option', None), _message(e))]
+        try:
+            config = _merge_includes(config, stream)
+        except (ValueError, IOError, configparser.Error) as e:
+            return [ConfigError(path, DIRECTIVE_SECTION, None, _message(e))]
+
+        errors = []
+        token_styles = {}
+        for name in config.sections():
+            if not _is_token_section(name):
+                continue
+            if not _TOKEN_NAME_RE.match(name):
+                errors.append(ConfigError(path, name, None,
+                                          'invalid token name'))
+                continue
+            section = config[name]
+            problems = list(_check_style_section(section))
+            errors.extend(ConfigError(path, name, k, m) for k, m in problems)
+            if not problems:
+                token_styles[_section_token(name)] = \
+                    _read_style_section(section)
+
+        if resolve and not errors:
+            try:
+                ResolvedStyle(create_style(None, token_styles))
+            except (ValueError, AssertionError) as e:
+                errors.append(ConfigError(path, None, None, _message(e)))
+        return errors
+
+    def write(self, stream, style):
+        styles = iter_style(style)
+        if self.profile is not None:
+            styles = self.profile.select(list(styles))
+        self.write_iter(stream, styles)
+
+    def write_iter(self, stream, styles):
+        """Write each token style as it arrives, in the same layout as
+        :meth:`ConfigParser.write`.
+        """
+        for token, style in styles:
+            stream.write('[{}]\n'.format(token))
+            for k, v in _style_options(style):
+                stream.write('{} = {}\n'.format(k, v))
+            stream.write('\n')
 
     def _create_configparser(self):
-        return ConfigParser(interpolation=ExtendedInterpolation(),
-                            default_section='IGNORED_DEFAULT')
+        return _create_configparser()
+
+
+def _create_configparser():
+    return ConfigParser(interpolation=ExtendedInterpolation(),
+                        default_section='IGNORED_DEFAULT')
+
+
+def _is_token_section(name):
+    """Is *name* a section that defines a token style?
+    """
+    return name != 'IGNORED_DEFAULT' and not name[0].islower()
+
+
+# Dotted names whose parts are capitalised identifiers, e.g. Name.Builtin
+_TOKEN_NAME_RE = re.compile(r'^[A-Z]\w*(\.[A-Z]\w*)*$')
+
+
+def _section_token(name):
+    """Get the token for the section called *name*, raising
+    :exc:`~exceptions.ValueError` if it isn't a valid token name.
+    """
+    if not _TOKEN_NAME_RE.match(name):
+        raise ValueError('invalid token name [{}]'.format(name))
+    return string_to_token(name)
+
+
+# Included files, see _load_include()
+_include_cache = {}
+_include_lock = threading.RLock()
+
+
+def _load_include(path, stack=()):
+    """Get the sections of the file at *path*, with its own includes merged
+    in, as a dict of dicts of uninterpolated values.
+
+    Each file is only parsed once per process while neither it nor anything
+    it includes is modified.  *stack* is the files including this one, for
+    detecting include cycles.
+    """
+    path = os.path.abspath(path)
+    if path in stack:
+        raise ValueError('include cycle: ' + ' -> '.join(stack + (path,)))
+
+    with _include_lock:
+        cached = _include_cache.get(path)
+        if cached is not None:
+            depends, sections = cached
+            if all(_mtime(p) == m for p, m in depends):
+                return sections, depends
+
+        mtime = _mtime(path)
+        config = _create_configparser()
+        with open(path, 'r') as f:
+            config.read_file(f)
+        sections, depends = _includes(config, f, stack + (path,))
+        for name, options in _raw_sections(config).iteritems():
+            sections.setdefault(name, {}).update(options)
+        depends = ((path, mtime),) + depends
+
+        _include_cache[path] = (depends, sections)
+        return sections, depends
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _includes(config, stream, stack=None):
+    """Load the files named in the ``[pygout]`` section of *config*, read
+    from *stream*, returning the merged sections (see
+    :func:`_load_include`) and the ``(path, mtime)`` pairs they depend on.
+    """
+    sections = {}
+    depends = ()
+    if not config.has_section(DIRECTIVE_SECTION):
+        return sections, depends
+
+    filename = getattr(stream, 'name', None)
+    if stack is None:
+        stack = (os.path.abspath(filename),) if filename else ()
+    directory = os.path.dirname(filename) if filename else ''
+
+    # Palettes last, so they override palettes from included styles
+    for option, token_sections in (('include', True), ('palette', False)):
+        value = config.get(DIRECTIVE_SECTION, option, raw=True, fallback='')
+        for name in value.split():
+            included, more = _load_include(os.path.join(directory, name),
+                                           stack)
+            depends += more
+            for section, options in included.iteritems():
+                if token_sections or not _is_token_section(section):
+                    sections.setdefault(section, {}).update(options)
+    return sections, depends
+
+
+def _raw_sections(config):
+    """Get the sections of *config*, except ``[pygout]``, as a dict of dicts
+    of uninterpolated values.
+    """
+    return dict((name, dict(config.items(name, raw=True)))
+                for name in config.sections() if name != DIRECTIVE_SECTION)
+
+
+def _merge_includes(config, stream):
+    """Get a new parser with the files included by *config*, read from
+    *stream*, merged in under it.  *config* is returned if it doesn't
+    include anything.
+    """
+    included = _includes(config, stream)[0]
+    if not included:
+        return config
+    merged = _create_configparser()
+    merged.read_dict(included)
+    merged.read_dict(_raw_sections(config))
+    return merged
+
+
+def _iter_sections(stream):
+    """Split *stream* into sections, yielding ``(name, lines)`` pairs.  Any
+    lines before the first section header are included with the first
+    section, so that :class:`ConfigParser` can complain about them.
+    """
+    name, lines = None, []
+    for line in stream:
+        match = ConfigParser.SECTCRE.match(line)
+        if match:
+            if name is not None:
+                yield name, lines
+                lines = []
+            name = match.group('header')
+        lines.append(line)
+    if name is not None:
+        yield name, lines
 
 
 def _read_style_section(section):
@@ -53,12 +320,62 @@ def _read_style_section(section):
     return ts
 
 
-def _write_style_section(section, style):
-    """Modify *section* by adding options that are set in *style*.
+def _check_style_section(section):
+    """Check each option in *section*, generating ``(option, message)``
+    pairs for the invalid ones.
+    """
+    ts = TokenStyleEditor()
+    for key in section:
+        try:
+            if key in BOOLEAN_OPTIONS:
+                setattr(ts, key, section.getboolean(key))
+            elif key in COLOR_OPTIONS:
+                setattr(ts, key, section.get(key))
+            else:
+                yield key, 'unknown option'
+        except (ValueError, configparser.Error) as e:
+            yield key, _message(e)
+
+
+def _message(exc):
+    """Get the first line of an exception's message.
+    """
+    return (str(exc).splitlines() or [exc.__class__.__name__])[0]
+
+
+def _style_options(style):
+    """Generate the ``(option, value)`` pairs for the options that are set
+    in *style*.
     """
     for k in ('bold', 'italic', 'underline', 'color', 'bgcolor', 'border'):
         v = getattr(style, k)
         if v is not None:
-            section[k] = str(v)
+            yield k, str(v)
     if style.inherit is False:
-        section['inherit'] = False
+        yield 'inherit', str(False)
+
+
+def check_files(filenames, resolve=True, processes=None):
+    """Validate each of *filenames* with :meth:`PygOutConfig.validate`
+    using a pool of *processes* worker processes (default: one per CPU),
+    returning all of the errors found, in file order.
+    """
+    pool = Pool(processes)
+    try:
+        results = pool.map(_check_file,
+                           [(f, resolve) for f in filenames], chunksize=16)
+    finally:
+        pool.close()
+        pool.join()
+    return [e for errors in results for e in errors]
+
+
+def _check_file(args):
+    """Worker for :func:`check_files`.
+    """
+    filename, resolve = args
+    try:
+        with open(filename, 'r') as f:
+            return PygOutConfig().validate(f, resolve, filename)
+    except (IOError, UnicodeDecodeError) as e:
+        return [ConfigError(filename, None, None, _message(e))]
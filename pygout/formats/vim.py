@@ -1,6 +1,10 @@
-from pygments.token import Token
+from multiprocessing import Pool
+
+from pygments.token import Token, string_to_tokentype
 
 from pygout.format import Format
+from pygout.style import TokenStyleEditor, ResolvedStyle, create_style
+from pygout.util import find_files, normalise_color
 
 
 PREAMBLE = """
@@ -23,34 +27,83 @@ TOKEN_MAP = [
 ]
 
 
+#: Background colors assumed for ``set background=...`` when the colorscheme
+#: doesn't give the Normal group a background.
+DEFAULT_BACKGROUND = {
+    'dark': '#000000',
+    'light': '#ffffff',
+}
+
+#: Vim's built-in links (see ``syncolor.vim``) for the groups in
+#: :data:`TOKEN_MAP`, used for groups the colorscheme doesn't define.
+DEFAULT_LINKS = {
+    'String': 'Constant',
+    'Number': 'Constant',
+    'Float': 'Number',
+    'Function': 'Identifier',
+    'Label': 'Statement',
+}
+
+
 class Vim(Format):
     # TODO: support cterm, not just gui
+    extension = '.vim'
+    uses_profile = True
+
+    def __init__(self, profile=None):
+        self.profile = profile
+
+    def read(self, stream):
+        """Read a Vim colorscheme from *stream*.
+
+        Only ``highlight`` (including links and ``hi clear``), ``set
+        background`` and ``let g:colors_name`` statements are understood;
+        everything else, including control flow, is ignored.  Groups are
+        mapped back onto tokens through :data:`TOKEN_MAP`.
+        """
+        scheme = _VimScheme()
+        for line in stream:
+            scheme.feed(line)
+        return scheme.create_style()
+
     def write(self, stream, style):
         # TODO: detect light/dark background
         # TODO: support style name
         stream.write(PREAMBLE.format(background='light', name='pygout'))
 
-        stream.write('hi Normal guibg={}\n\n'.format(style.background_color))
+        resolved = ResolvedStyle(style)
+        stream.write('hi Normal guibg={}\n\n'.format(
+            resolved.background_color))
+        self._write_groups(stream, resolved, TOKEN_MAP)
 
-        for t, vimgroups in TOKEN_MAP:
-            tokenstyle = style.find_style_for_token(t)
+    def write_patch(self, stream, style, diff):
+        """Write ``hi`` commands for only the groups whose tokens' effective
+        styles changed.  Unset attributes are explicitly set to ``NONE``,
+        because Vim merges new attributes into a group's old ones.
+        """
+        resolved = ResolvedStyle(style)
+        if diff.background:
+            stream.write('hi Normal guibg={}\n\n'.format(
+                resolved.background_color or 'NONE'))
+        self._write_groups(stream, resolved,
+                           [(t, g) for t, g in TOKEN_MAP if diff.changed(t)],
+                           explicit=True)
+
+    def _write_groups(self, stream, resolved, token_map, explicit=False):
+        if self.profile is not None:
+            token_map = self.profile.select(token_map)
+        for t, vimgroups in token_map:
+            tokenstyle = resolved.find(t)
 
             groupstyle = {
-                'guifg': None,
-                'guibg': None,
-                'guisp': None,
+                'guifg': tokenstyle.color,
+                'guibg': tokenstyle.bgcolor,
+                'guisp': tokenstyle.border,
                 'gui': [k for k in ('bold', 'italic', 'underline')
-                        if tokenstyle[k] is True],
+                        if getattr(tokenstyle, k) is True],
             }
 
-            if tokenstyle['color'] is not None:
-                groupstyle['guifg'] = '#' + tokenstyle['color']
-
-            if tokenstyle['bgcolor'] is not None:
-                groupstyle['guibg'] = '#' + tokenstyle['bgcolor']
-
-            if tokenstyle['border'] is not None:
-                groupstyle['guisp'] = '#' + tokenstyle['border']
+            if tokenstyle.border is not None:
                 groupstyle['gui'].append('undercurl')
 
             if len(groupstyle['gui']) > 0:
@@ -58,6 +111,13 @@ class Vim(Format):
             else:
                 groupstyle['gui'] = None
 
+            if explicit:
+                # Normal's background is the style's background, not NONE
+                if t is Token and groupstyle['guibg'] is None:
+                    groupstyle['guibg'] = resolved.background_color
+                for k, v in groupstyle.items():
+                    groupstyle[k] = v or 'NONE'
+
             stylestring = ' '.join('{}={}'.format(k, v)
                                    for k, v in groupstyle.iteritems() if v)
 
@@ -70,3 +130,184 @@ class Vim(Format):
                 stream.write('hi {} {}\n'.format(group, stylestring))
 
             stream.write('\n')
+
+
+def read_directory(path, processes=None):
+    """Read every ``*.vim`` file below *path* using a pool of *processes*
+    worker processes (default: one per CPU), returning a dict mapping each
+    file's path to its style.
+    """
+    filenames = find_files([path], '.vim')
+
+    pool = Pool(processes)
+    try:
+        results = pool.map(_read_file, filenames, chunksize=16)
+    finally:
+        pool.close()
+        pool.join()
+
+    styles = {}
+    for filename, name, token_styles, bgcolor in results:
+        token_styles = dict((string_to_tokentype(k), TokenStyleEditor(v))
+                            for k, v in token_styles.iteritems())
+        styles[filename] = create_style(name, token_styles, bgcolor)
+    return styles
+
+
+def _read_file(filename):
+    """Worker for :func:`read_directory`.  Styles can't be pickled, and
+    tokens lose their identity when they are, so the result is returned as
+    strings for the parent process to rebuild.
+    """
+    scheme = _VimScheme()
+    with open(filename, 'r') as f:
+        for line in f:
+            scheme.feed(line)
+    token_styles = dict((str(k), str(v))
+                        for k, v in scheme.token_styles().iteritems())
+    return filename, scheme.name, token_styles, scheme.background_color()
+
+
+def _vim_color(value):
+    """Convert a Vim color to a normalised color, or None for anything that
+    isn't a hex color (``NONE``, ``fg``, color names, ...).
+    """
+    if value is None or not value.startswith('#'):
+        return None
+    try:
+        return normalise_color(value)
+    except ValueError:
+        return None
+
+
+def _is_abbreviation(word, command, minimum):
+    """Is *word* an abbreviation of the Vim *command* at least *minimum*
+    characters long?
+    """
+    return len(word) >= minimum and command.startswith(word)
+
+
+class _VimScheme(object):
+    """The highlighting state built up by a colorscheme, fed one line at a
+    time.
+    """
+    def __init__(self):
+        self.name = None
+        self.background = None
+        #: Highlight group -> {attribute: value}
+        self.groups = {}
+        #: Highlight group -> linked highlight group
+        self.links = {}
+
+    def feed(self, line):
+        words = line.split()
+        if not words or words[0].startswith('"'):
+            return
+
+        command = words[0].rstrip('!')
+        if _is_abbreviation(command, 'highlight', 2):
+            self._highlight(words[1:])
+        elif _is_abbreviation(command, 'set', 2):
+            for w in words[1:]:
+                option, _, value = w.partition('=')
+                if option in ('background', 'bg'):
+                    self.background = value
+        elif command == 'let':
+            variable, _, value = ''.join(words[1:]).partition('=')
+            if variable == 'g:colors_name':
+                self.name = value.strip('\'"')
+
+    def _highlight(self, args):
+        # Drop trailing comment
+        for i, arg in enumerate(args):
+            if arg.startswith('"'):
+                args = args[:i]
+                break
+
+        if args and args[0] in ('default', 'def'):
+            default = True
+            args = args[1:]
+        else:
+            default = False
+
+        if not args:
+            return
+        elif args[0] == 'clear':
+            if len(args) > 1:
+                self.groups.pop(args[1], None)
+            else:
+                self.groups.clear()
+        elif args[0] == 'link':
+            if len(args) < 3:
+                return
+            group, target = args[1], args[2]
+            if default and (group in self.groups or group in self.links):
+                return
+            if target == 'NONE':
+                self.links.pop(group, None)
+            else:
+                self.links[group] = target
+        else:
+            group = args[0]
+            if default and group in self.groups:
+                return
+            attrs = self.groups.setdefault(group, {})
+            for arg in args[1:]:
+                if arg == 'NONE':
+                    attrs.clear()
+                    continue
+                key, _, value = arg.partition('=')
+                attrs[key.lower()] = value
+
+    def _resolve(self, group):
+        """Get the attributes for *group*, following links, or None if the
+        group isn't defined.
+        """
+        seen = set()
+        while group not in seen:
+            seen.add(group)
+            if self.groups.get(group):
+                return self.groups[group]
+            elif group in self.links:
+                group = self.links[group]
+            elif group in DEFAULT_LINKS:
+                group = DEFAULT_LINKS[group]
+            else:
+                break
+        return None
+
+    def background_color(self):
+        normal = self.groups.get('Normal', {})
+        return (_vim_color(normal.get('guibg'))
+                or DEFAULT_BACKGROUND.get(self.background))
+
+    def token_styles(self):
+        """Map highlight groups back onto tokens through :data:`TOKEN_MAP`,
+        using the first group defined for each token.
+        """
+        styles = {}
+        for token, vimgroups in TOKEN_MAP:
+            for group in vimgroups:
+                attrs = self._resolve(group)
+                if attrs is not None:
+                    styles[token] = self._group_style(group, attrs)
+                    break
+        return styles
+
+    def _group_style(self, group, attrs):
+        ts = TokenStyleEditor()
+        ts.color = _vim_color(attrs.get('guifg'))
+        # Normal's background is the style's background
+        if group != 'Normal':
+            ts.bgcolor = _vim_color(attrs.get('guibg'))
+        ts.border = _vim_color(attrs.get('guisp'))
+        if 'gui' in attrs:
+            gui = attrs['gui'].lower().split(',')
+            ts.bold = 'bold' in gui
+            ts.italic = 'italic' in gui
+            ts.underline = 'underline' in gui
+        return ts
+
+    def create_style(self):
+        return create_style(self.name, self.token_styles(),
+                            self.background_color())
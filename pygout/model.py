@@ -0,0 +1,141 @@
+from pygments.token import Token, STANDARD_TYPES
+
+from pygout.style import TokenStyleEditor, create_style
+from pygout.style import EMPTY_TOKEN_STYLE, resolve_token_style
+from pygout.tokens import sort_tokens, token_ancestors
+
+
+class StyleModel(object):
+    """A mutable style which keeps its resolved view up to date as it is
+    edited.
+
+    Token styles are changed with :meth:`set` or :meth:`update`, which only
+    re-resolve the edited token's subtree, stopping at tokens which don't
+    inherit from their parent.  Functions registered with :meth:`subscribe`
+    are called as ``callback(model, tokens)`` after each edit, with the
+    sorted list of tokens whose resolved style changed.
+    """
+    def __init__(self, name=None, styles=None, bgcolor=None, hlcolor=None):
+        self.name = name
+        self.background_color = bgcolor
+        self.highlight_color = hlcolor
+        #: Token -> TokenStyleEditor, owned by the model
+        self._styles = {}
+        #: Token -> TokenStyle, for every known token
+        self._resolved = {}
+        #: Token -> set of known child tokens
+        self._children = {}
+        self._listeners = []
+
+        styles = styles or {}
+        for token, style in styles.iteritems():
+            self._styles[token] = TokenStyleEditor(style)
+
+        tokens = set(STANDARD_TYPES)
+        for t in styles:
+            tokens.update(token_ancestors(t))
+        # Sorting puts parents before their children
+        for token in sort_tokens(tokens):
+            self._add_token(token)
+
+    @classmethod
+    def from_style(cls, style):
+        """Create a model from a :class:`~pygout.style.Style`.
+        """
+        return cls(style.pygout_name, style.pygout_styles,
+                   style.background_color, style.highlight_color)
+
+    def to_style(self):
+        """Create a :class:`~pygout.style.Style` from the model's current
+        state.
+        """
+        styles = dict((t, TokenStyleEditor(s))
+                      for t, s in self._styles.iteritems())
+        return create_style(self.name, styles,
+                            self.background_color, self.highlight_color)
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def get(self, token):
+        """Get a copy of the :class:`~pygout.style.TokenStyleEditor` for
+        *token*, or None if it isn't styled.
+        """
+        style = self._styles.get(token)
+        return None if style is None else TokenStyleEditor(style)
+
+    def resolve(self, token):
+        """Get the resolved :class:`~pygout.style.TokenStyle` for *token*.
+        """
+        if token not in self._resolved:
+            for t in reversed(token_ancestors(token)):
+                if t not in self._resolved:
+                    self._add_token(t)
+        return self._resolved[token]
+
+    def set(self, token, style):
+        """Replace the style of *token* with *style* (a
+        :class:`~pygout.style.TokenStyleEditor` or Pygments style string), or
+        remove it if *style* is None.  Returns the sorted list of tokens whose
+        resolved style changed.
+        """
+        self.resolve(token)
+        if style is None:
+            self._styles.pop(token, None)
+        else:
+            self._styles[token] = TokenStyleEditor(style)
+
+        changed = []
+        self._invalidate(token, token is Token, changed)
+        changed.sort()
+        if changed:
+            for callback in list(self._listeners):
+                callback(self, changed)
+        return changed
+
+    def update(self, token, **attrs):
+        """Change individual attributes of *token*'s style, e.g.
+        ``model.update(Token.Name, color='#f00', bold=None)``.
+        """
+        style = self.get(token) or TokenStyleEditor()
+        for k, v in attrs.iteritems():
+            setattr(style, k, v)
+        return self.set(token, style)
+
+    def _add_token(self, token):
+        """Start tracking *token*, whose parent must already be tracked.
+        """
+        self._children[token] = set()
+        if token.parent is not None:
+            self._children[token.parent].add(token)
+        self._resolved[token] = self._compute(token)
+
+    def _compute(self, token):
+        if token.parent is None:
+            parent = base = EMPTY_TOKEN_STYLE
+        else:
+            parent = self._resolved[token.parent]
+            base = self._resolved[Token]
+        return resolve_token_style(parent, base, self._styles.get(token))
+
+    def _invalidate(self, token, everything, changed):
+        """Re-resolve *token*, and then its children if it changed.  Tokens
+        that don't inherit only depend on their parent through the base
+        :const:`~pygments.token.Token`, so are only visited if *everything*
+        (i.e. the base token) was invalidated.
+        """
+        old = self._resolved[token]
+        new = self._compute(token)
+        if new != old:
+            self._resolved[token] = new
+            changed.append(token)
+        elif not everything:
+            return
+
+        for child in self._children[token]:
+            style = self._styles.get(child)
+            if everything or style is None or style.inherit:
+                self._invalidate(child, everything, changed)
@@ -0,0 +1,219 @@
+"""Render sample code in many styles at once, for comparing styles.
+
+Each sample is lexed once and its token stream is cached on disk, and then
+every style is applied to the same token stream by looking tokens up in the
+style's :class:`~pygout.style.ResolvedStyle`.  Styles are rendered in
+parallel worker processes.
+"""
+import cgi
+import hashlib
+import json
+import os
+from multiprocessing import Pool
+
+import pygments
+from pygments.lexers import get_lexer_by_name
+from pygments.token import string_to_tokentype
+
+from pygout.catalog import get_builtin_style
+from pygout.formats.ansi import RESET, sgr
+from pygout.style import ResolvedStyle
+from pygout.util import atomic_write, cache_dir
+
+
+#: Sample code used when none is given.
+DEFAULT_SAMPLE = ('python', '''\
+import re
+
+# Find all the words
+@memoize
+def words(text, pattern=r'\\w+'):
+    """Return the words in *text*."""
+    return [w.lower() for w in re.findall(pattern, text) if len(w) > 0x2]
+
+class Counter(dict):
+    def add(self, word, n=1.5):
+        self[word] = self.get(word, 0) + n
+''')
+
+
+def lex(code, lexer, cache=True):
+    """Lex *code* with the Pygments lexer called *lexer*, returning a list of
+    ``(token, text)`` pairs.
+
+    If *cache* is true the token stream is cached in the ``tokens`` cache
+    directory, keyed by the lexer, the code and the Pygments version, so
+    that it is reused by later runs.
+    """
+    if isinstance(code, unicode):
+        data = code.encode('utf-8')
+    else:
+        data = code
+    key = hashlib.sha1('\0'.join([pygments.__version__, lexer, data]))
+    key = key.hexdigest()
+    path = os.path.join(cache_dir('tokens'), key + '.json') if cache else None
+
+    if path and os.path.exists(path):
+        with open(path, 'r') as f:
+            return _load_tokens(json.load(f))
+
+    tokens = list(get_lexer_by_name(lexer).get_tokens(code))
+    if path:
+        with atomic_write(path) as f:
+            json.dump(_dump_tokens(tokens), f)
+    return tokens
+
+
+def _dump_tokens(tokens):
+    return [(str(t), text) for t, text in tokens]
+
+
+def _load_tokens(tokens):
+    return [(string_to_tokentype(str(t)), text) for t, text in tokens]
+
+
+class HtmlRenderer(object):
+    """Render token streams as HTML with inline styles.
+    """
+    def __init__(self, resolved):
+        self.resolved = resolved
+        self._spans = {}
+
+    def _span(self, token):
+        span = self._spans.get(token)
+        if span is None:
+            ts = self.resolved.find(token)
+            decls = []
+            if ts.color:
+                decls.append('color: ' + ts.color)
+            if ts.bgcolor:
+                decls.append('background-color: ' + ts.bgcolor)
+            if ts.bold:
+                decls.append('font-weight: bold')
+            if ts.italic:
+                decls.append('font-style: italic')
+            if ts.underline:
+                decls.append('text-decoration: underline')
+            if ts.border:
+                decls.append('border: 1px solid ' + ts.border)
+            if decls:
+                span = ('<span style="{}">'.format('; '.join(decls)),
+                        '</span>')
+            else:
+                span = ('', '')
+            self._spans[token] = span
+        return span
+
+    def render(self, tokens):
+        parts = ['<pre style="background: {}; padding: 0.5em">'.format(
+            self.resolved.background_color or 'transparent')]
+        for token, text in tokens:
+            start, end = self._span(token)
+            parts.extend((start, cgi.escape(text), end))
+        parts.append('</pre>')
+        return ''.join(parts)
+
+
+class AnsiRenderer(object):
+    """Render token streams with terminal escape sequences, see
+    :func:`pygout.formats.ansi.sgr`.
+    """
+    def __init__(self, resolved, depth='truecolor'):
+        self.resolved = resolved
+        self.depth = depth
+        self._codes = {}
+
+    def _code(self, token):
+        code = self._codes.get(token)
+        if code is None:
+            code = self._codes[token] = sgr(self.resolved.find(token),
+                                            self.depth,
+                                            self.resolved.background_color)
+        return code
+
+    def render(self, tokens):
+        parts = []
+        for token, text in tokens:
+            if not text:
+                continue
+            code = self._code(token)
+            # Reset at line ends, so the background doesn't fill the line
+            parts.append(code + text.replace('\n', RESET + '\n' + code))
+        parts.append(RESET)
+        return ''.join(parts)
+
+
+#: Renderers for each preview format.
+RENDERERS = {
+    'html': HtmlRenderer,
+    'ansi': AnsiRenderer,
+}
+
+
+def render_style(name, samples, format='html'):
+    """Render each of *samples*, lists of ``(token, text)`` pairs, in the
+    Pygments style called *name*, returning a list of strings.
+    """
+    renderer = RENDERERS[format](ResolvedStyle(get_builtin_style(name)))
+    return [renderer.render(tokens) for tokens in samples]
+
+
+# Token streams for the current worker process, see _init_worker()
+_worker_samples = None
+
+
+def _init_worker(samples):
+    global _worker_samples
+    _worker_samples = [_load_tokens(s) for s in samples]
+
+
+def _render_worker(args):
+    name, format = args
+    return name, render_style(name, _worker_samples, format)
+
+
+def contact_sheet(styles, samples=None, format='html', processes=None,
+                  cache=True):
+    """Render *samples*, a list of ``(lexer, code)`` pairs, in each of the
+    Pygments styles named in *styles* and return a single document (HTML or
+    ANSI, depending on *format*) showing them all.
+
+    The samples are lexed once, and sent once to each of *processes* worker
+    processes (default: one per CPU), which render a style at a time.
+    """
+    if format not in RENDERERS:
+        raise ValueError('unknown preview format {}'.format(format))
+    samples = samples or [DEFAULT_SAMPLE]
+    tokens = [_dump_tokens(lex(code, lexer, cache))
+              for lexer, code in samples]
+
+    pool = Pool(processes, _init_worker, (tokens,))
+    try:
+        rendered = pool.map(_render_worker,
+                            [(name, format) for name in styles])
+    finally:
+        pool.close()
+        pool.join()
+
+    if format == 'html':
+        return _html_sheet(rendered)
+    else:
+        return _ansi_sheet(rendered)
+
+
+def _html_sheet(rendered):
+    parts = ['<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8">'
+             '<title>PygOut style preview</title></head>\n<body>\n']
+    for name, outputs in rendered:
+        parts.append('<h2>{}</h2>\n'.format(cgi.escape(name)))
+        parts.extend(o + '\n' for o in outputs)
+    parts.append('</body>\n</html>\n')
+    return ''.join(parts)
+
+
+def _ansi_sheet(rendered):
+    parts = []
+    for name, outputs in rendered:
+        parts.append('\x1b[1m== {} ==\x1b[0m\n'.format(name))
+        parts.extend(o + '\n' for o in outputs)
+    return ''.join(parts)
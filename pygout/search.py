@@ -0,0 +1,224 @@
+"""Search styles by color similarity.
+
+A :class:`StyleIndex` holds, for each style, a vector of CIE L*a*b* colors:
+the background and the effective text color of each of :data:`KEY_TOKENS`.
+Queries use k-d trees over the relevant parts of those vectors, so that
+Euclidean distance is (approximately) perceptual color difference.
+"""
+import heapq
+import json
+import math
+import os
+
+import pygments
+from pygments.token import Token, string_to_tokentype
+
+from pygout.catalog import get_catalog
+from pygout.style import ResolvedStyle
+from pygout.util import atomic_write, cache_dir, color_to_lab
+
+
+#: Tokens whose colors are indexed for each style.
+KEY_TOKENS = [
+    Token.Text,
+    Token.Comment,
+    Token.Keyword,
+    Token.Name.Builtin,
+    Token.Name.Class,
+    Token.Name.Function,
+    Token.Number,
+    Token.Operator,
+    Token.String,
+]
+
+#: Text color assumed for tokens which don't have one, on a light background.
+DEFAULT_COLOR = '#000000'
+
+#: Text color assumed for tokens which don't have one, on a dark background.
+DEFAULT_DARK_COLOR = '#ffffff'
+
+#: Backgrounds with a lightness (L*) below this are dark.
+DARK_LIGHTNESS = 50
+
+
+class KDTree(object):
+    """A k-d tree for nearest neighbour queries over a list of equal-length
+    point tuples.
+    """
+    def __init__(self, points):
+        self.points = points
+        self._root = self._build(range(len(points)), 0)
+
+    def _build(self, indices, depth):
+        if not indices:
+            return None
+        axis = depth % len(self.points[indices[0]])
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+        return (indices[mid], axis,
+                self._build(indices[:mid], depth + 1),
+                self._build(indices[mid + 1:], depth + 1))
+
+    def nearest(self, point, k=1, accept=None):
+        """Find the *k* points nearest to *point*, returning a list of
+        ``(distance, index)`` pairs, nearest first.  If *accept* is given,
+        only indices for which it returns true are considered.
+        """
+        # Max-heap of the best k so far, as (-distance squared, index)
+        best = []
+
+        def search(node):
+            if node is None:
+                return
+            i, axis, left, right = node
+            p = self.points[i]
+            if accept is None or accept(i):
+                d2 = sum((a - b) ** 2 for a, b in zip(point, p))
+                if len(best) < k:
+                    heapq.heappush(best, (-d2, i))
+                elif d2 < -best[0][0]:
+                    heapq.heapreplace(best, (-d2, i))
+            diff = point[axis] - p[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            if len(best) < k or diff * diff < -best[0][0]:
+                search(far)
+
+        search(self._root)
+        return sorted((math.sqrt(-d2), i) for d2, i in best)
+
+
+def style_vector(style):
+    """Get the list of L*a*b* colors indexed for *style*: the background
+    followed by the color of each of :data:`KEY_TOKENS`.
+    """
+    resolved = ResolvedStyle(style)
+    background = color_to_lab(resolved.background_color or '#ffffff')
+    default = (DEFAULT_DARK_COLOR if background[0] < DARK_LIGHTNESS
+               else DEFAULT_COLOR)
+    return [background] + [color_to_lab(resolved.find(t).color or default)
+                           for t in KEY_TOKENS]
+
+
+class StyleIndex(object):
+    """An index of styles by color, see :func:`style_vector`.
+    """
+    def __init__(self, names=(), vectors=()):
+        self.names = list(names)
+        self.vectors = [[tuple(c) for c in v] for v in vectors]
+        self._trees = {}
+
+    @classmethod
+    def build(cls, styles):
+        """Build an index from a dict mapping names to styles.
+        """
+        names = sorted(styles)
+        return cls(names, [style_vector(styles[n]) for n in names])
+
+    @classmethod
+    def build_pygments(cls):
+        """Build an index of all of the Pygments styles.
+        """
+        return cls.build(get_catalog())
+
+    def save(self, path):
+        data = {
+            'pygments': pygments.__version__,
+            'tokens': [str(t) for t in KEY_TOKENS],
+            'styles': [{'name': n, 'vector': v}
+                       for n, v in zip(self.names, self.vectors)],
+        }
+        with atomic_write(path) as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with :meth:`save`, raising
+        :exc:`~exceptions.ValueError` if it was built by an incompatible
+        version.
+        """
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('tokens') != [str(t) for t in KEY_TOKENS]:
+            raise ValueError('index has different tokens')
+        return cls([s['name'] for s in data['styles']],
+                   [s['vector'] for s in data['styles']])
+
+    def _tree(self, slots):
+        """Get a tree over the parts of each style's vector in *slots*.
+        """
+        tree = self._trees.get(slots)
+        if tree is None:
+            points = [sum((v[s] for s in slots), ()) for v in self.vectors]
+            tree = self._trees[slots] = KDTree(points)
+        return tree
+
+    def search(self, colors=None, background=None, k=5):
+        """Find the *k* styles closest to *colors*, a dict mapping tokens in
+        :data:`KEY_TOKENS` to colors, returning ``(distance, name)`` pairs.
+
+        *background* may be a color, which is matched like the token
+        colors, or ``'dark'`` or ``'light'`` to only consider styles with
+        that kind of background.
+        """
+        wanted = [(KEY_TOKENS.index(t) + 1, c)
+                  for t, c in (colors or {}).iteritems()]
+        accept = None
+        if background in ('dark', 'light'):
+            dark = background == 'dark'
+            accept = lambda i: ((self.vectors[i][0][0] < DARK_LIGHTNESS)
+                                == dark)
+        elif background is not None:
+            wanted.append((0, background))
+
+        wanted.sort()
+        slots = [s for s, _ in wanted]
+        point = sum((color_to_lab(c) for _, c in wanted), ())
+        if not slots:
+            # Nothing to compare, so everything is as good as everything else
+            slots = [0]
+            point = (0, 0, 0)
+        return self._query(tuple(slots), point, k, accept)
+
+    def similar(self, style, k=5):
+        """Find the *k* indexed styles most similar to *style* overall.
+        """
+        point = sum(style_vector(style), ())
+        return self._query(tuple(range(len(KEY_TOKENS) + 1)), point, k)
+
+    def _query(self, slots, point, k, accept=None):
+        if not self.vectors:
+            return []
+        return [(d, self.names[i])
+                for d, i in self._tree(slots).nearest(point, k, accept)]
+
+
+def default_index_path():
+    return os.path.join(cache_dir('search'),
+                        'pygments-{}.json'.format(pygments.__version__))
+
+
+def load_default_index():
+    """Load the index of Pygments styles, building it first if it doesn't
+    exist for the installed Pygments version.
+    """
+    path = default_index_path()
+    if os.path.exists(path):
+        try:
+            return StyleIndex.load(path)
+        except ValueError:
+            pass
+    index = StyleIndex.build_pygments()
+    index.save(path)
+    return index
+
+
+def parse_token(name):
+    """Get a token in :data:`KEY_TOKENS` from a name like ``Keyword``,
+    raising :exc:`~exceptions.ValueError` if it isn't indexed.
+    """
+    token = string_to_tokentype(name)
+    if token not in KEY_TOKENS:
+        raise ValueError('{} is not indexed, try one of: {}'.format(
+            name, ', '.join(str(t) for t in KEY_TOKENS)))
+    return token
@@ -1,9 +1,11 @@
 import re
+from collections import namedtuple
 
 import pygments.style
 from pygments.token import Token
 from pygments.styles import get_style_by_name
 
+from pygout.tokens import sort_tokens, token_ancestors
 from pygout.util import normalise_color, ValueFilter
 
 
@@ -144,8 +146,7 @@ class StyleMeta(pygments.style.StyleMeta):
         the hierarchy if *token* doesn't have a style, defaulting to the base
         :const:`~pygments.token.Token`.
         """
-        hierarchy = reversed(token.split())
-        for t in hierarchy:
+        for t in token_ancestors(token):
             if cls.styles_token(t):
                 return cls.style_for_token(t)
         # Fallback: use Token style
@@ -182,6 +183,15 @@ def create_style(name, styles, bgcolor=None, hlcolor=None):
     return StyleMeta('PygOutGeneratedStyle', (Style,), attrs)
 
 
+def iter_style(style):
+    """Iterate over the ``(token, TokenStyleEditor)`` pairs of a
+    :class:`Style` created by PygOut, in token order.
+    """
+    styles = style.pygout_styles
+    for token in sort_tokens(styles):
+        yield token, styles[token]
+
+
 def create_style_from_pygments(name):
     """Create a :class:`Style` from a named Pygments style.
 
@@ -195,7 +205,9 @@ def create_style_from_pygments(name):
     attrs = {
         'background_color': pygments_style.background_color,
         'highlight_color': pygments_style.highlight_color,
-        'styles': pygments_style.styles,
+        # StyleMeta adds missing tokens to the styles dict, so don't give it
+        # the one shared with the Pygments style
+        'styles': dict(pygments_style.styles),
         'pygout_name': name,
         'pygout_styles':
             dict((k, TokenStyleEditor(v))
@@ -203,3 +215,95 @@ def create_style_from_pygments(name):
     }
 
     return StyleMeta(pygments_style.__name__, (Style,), attrs)
+
+
+#: A fully resolved token style.  Colors are normalised or *None*, and
+#: *bold*, *italic* and *underline* are *True* or *False*.
+TokenStyle = namedtuple('TokenStyle',
+                        'color bgcolor border bold italic underline')
+
+
+#: The style of a token with no style definitions at all.
+EMPTY_TOKEN_STYLE = TokenStyle(None, None, None, False, False, False)
+
+
+def resolve_token_style(parent, base, style):
+    """Resolve a token's :class:`TokenStyle` from its *parent*'s resolved
+    style, the resolved style of the base :const:`~pygments.token.Token`
+    (used instead of *parent* if the token doesn't inherit), and its own
+    :class:`TokenStyleEditor` *style*, which may be None.
+
+    This follows the same rules as :class:`pygments.style.StyleMeta`.
+    """
+    if style is None:
+        return parent
+    if style.inherit is False:
+        parent = base
+
+    def pick(value, inherited):
+        return inherited if value is None else value
+
+    return TokenStyle(color=pick(style.color, parent.color),
+                      bgcolor=pick(style.bgcolor, parent.bgcolor),
+                      border=pick(style.border, parent.border),
+                      bold=pick(style.bold, parent.bold),
+                      italic=pick(style.italic, parent.italic),
+                      underline=pick(style.underline, parent.underline))
+
+
+def _token_style(ndef):
+    """Convert a Pygments style dict to a :class:`TokenStyle`.
+    """
+    def color(value):
+        return normalise_color('#' + value) if value else None
+
+    return TokenStyle(color=color(ndef['color']),
+                      bgcolor=color(ndef['bgcolor']),
+                      border=color(ndef['border']),
+                      bold=ndef['bold'],
+                      italic=ndef['italic'],
+                      underline=ndef['underline'])
+
+
+class ResolvedStyle(object):
+    """An immutable, fully resolved view of a :class:`Style`, mapping every
+    token the style knows about to its effective :class:`TokenStyle`.
+
+    Instances can't be modified once created, so can be freely shared
+    between threads.
+    """
+    __slots__ = ('name', 'background_color', 'highlight_color', '_tokens')
+
+    def __init__(self, style):
+        set_ = super(ResolvedStyle, self).__setattr__
+        set_('name', getattr(style, 'pygout_name', None))
+        set_('background_color', normalise_color(style.background_color))
+        set_('highlight_color', normalise_color(style.highlight_color))
+        set_('_tokens', dict((t, _token_style(s)) for t, s in style))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ResolvedStyle is immutable')
+
+    def __getitem__(self, token):
+        return self._tokens[token]
+
+    def __contains__(self, token):
+        return token in self._tokens
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __iter__(self):
+        """Iterate over ``(token, TokenStyle)`` pairs in token order.
+        """
+        for token in sort_tokens(self._tokens):
+            yield token, self._tokens[token]
+
+    def find(self, token):
+        """Like :meth:`StyleMeta.find_style_for_token`, get the style of
+        *token* or its closest resolved ancestor.
+        """
+        for t in token_ancestors(token):
+            if t in self._tokens:
+                return self._tokens[t]
+        return self._tokens[Token]
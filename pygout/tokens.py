@@ -0,0 +1,129 @@
+"""A registry of token types, for working with very large sets of them.
+
+Pygments token types are tuples of names, so finding a token's ancestors
+(:meth:`~pygments.token._TokenType.split`) builds a new list each time and
+comparing tokens compares their names one by one.  The registry is a trie
+with a node for each token, holding its depth and precomputed ancestors, and
+it numbers tokens in token order, so that parsing names, walking up the
+hierarchy and sorting don't depend on how deep tokens are.
+
+The tokens are still Pygments' own (interned) token types.
+"""
+import threading
+
+from pygments.token import Token
+
+
+class TokenNode(object):
+    """A token type's node in a :class:`TokenRegistry`.
+    """
+    __slots__ = ('token', 'parent', 'depth', 'ancestors', 'children')
+
+    def __init__(self, token, parent):
+        self.token = token
+        #: The parent's node, or *None* for :const:`~pygments.token.Token`
+        self.parent = parent
+        #: The number of ancestors
+        self.depth = 0 if parent is None else parent.depth + 1
+        #: The token and its ancestors, nearest first (the reverse of
+        #: ``token.split()``)
+        self.ancestors = (token,) + (() if parent is None
+                                     else parent.ancestors)
+        #: Name -> child node
+        self.children = {}
+
+
+class TokenRegistry(object):
+    """An interned trie of token types.  Nodes are created the first time a
+    token is seen, and never removed.  All methods are thread-safe.
+    """
+    def __init__(self):
+        self._root = TokenNode(Token, None)
+        self._nodes = {Token: self._root}
+        self._names = {}
+        self._lock = threading.RLock()
+        # Token -> position in token order, or None if out of date
+        self._order = None
+
+    def node(self, token):
+        """Get the :class:`TokenNode` for *token*.
+        """
+        node = self._nodes.get(token)
+        if node is None:
+            parent = self.node(token.parent)
+            with self._lock:
+                node = self._nodes.get(token)
+                if node is None:
+                    node = self._nodes[token] = TokenNode(token, parent)
+                    parent.children[token[-1]] = node
+                    self._order = None
+        return node
+
+    def get(self, name):
+        """Get the token type called *name*, like
+        :func:`pygments.token.string_to_tokentype`, e.g. ``Name.Builtin`` or
+        ``Token.Name.Builtin``.  Each name is only parsed once.
+        """
+        token = self._names.get(name)
+        if token is None:
+            token = Token
+            for part in name.split('.') if name else ():
+                token = getattr(token, part)
+            self.node(token)
+            self._names[name] = token
+        return token
+
+    def ancestors(self, token):
+        """Get *token* and its ancestors, nearest first.
+        """
+        return self.node(token).ancestors
+
+    def sort(self, tokens):
+        """Get a list of *tokens* in token order (the same as ``sorted()``).
+        """
+        tokens = list(tokens)
+        nodes = self._nodes
+        for t in tokens:
+            if t not in nodes:
+                self.node(t)
+        with self._lock:
+            if self._order is None:
+                self._order = self._number()
+            order = self._order
+        return sorted(tokens, key=order.__getitem__)
+
+    def _number(self):
+        """Number every token in token order, i.e. pre-order with children
+        sorted by name.
+        """
+        order = {}
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            order[node.token] = len(order)
+            children = node.children
+            stack.extend(children[k] for k in sorted(children, reverse=True))
+        return order
+
+
+#: The registry used by the functions below.
+registry = TokenRegistry()
+
+
+def string_to_token(name):
+    """Get the token type called *name*, see :meth:`TokenRegistry.get`.
+    """
+    return registry.get(name)
+
+
+def token_ancestors(token):
+    """Get *token* and its ancestors, nearest first, see
+    :meth:`TokenRegistry.ancestors`.
+    """
+    return registry.ancestors(token)
+
+
+def sort_tokens(tokens):
+    """Sort *tokens* into token order, see :meth:`TokenRegistry.sort`.
+    """
+    return registry.sort(tokens)
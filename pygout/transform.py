@@ -0,0 +1,199 @@
+"""Generate variants of a style by transforming all of its colors at once.
+
+A transform is any function which takes an ``(N, 3)`` array of sRGB colors,
+with values from 0 to 1, and returns a new array of the same shape.  The
+functions here create transforms which work in CIE L*a*b*, and
+:func:`compose` chains them together, e.g.::
+
+    dim = compose(desaturate(0.3), darken(0.2))
+    variant = transform_style(style, dim, 'dim')
+
+This module requires NumPy.
+"""
+import numpy as np
+
+from pygout.style import TokenStyleEditor, create_style
+from pygout.util import color_to_rgb, normalise_color
+
+
+#: :class:`~pygout.style.TokenStyleEditor` attributes which hold colors.
+COLOR_ATTRS = ('color', 'bgcolor', 'border')
+
+# sRGB (D65) <-> XYZ, with XYZ scaled so that the white point is (1, 1, 1)
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+_RGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]]) / _WHITE[:, None]
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+
+_EPSILON = 216 / 24389.0
+_KAPPA = 24389 / 27.0
+
+
+def rgb_to_lab(rgb):
+    """Convert an ``(N, 3)`` array of sRGB colors to CIE L*a*b*.
+    """
+    rgb = np.asarray(rgb, dtype=float)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92,
+                      ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear.dot(_RGB_TO_XYZ.T)
+    f = np.where(xyz > _EPSILON, np.cbrt(xyz), (_KAPPA * xyz + 16) / 116.0)
+    return np.column_stack((116 * f[:, 1] - 16,
+                            500 * (f[:, 0] - f[:, 1]),
+                            200 * (f[:, 1] - f[:, 2])))
+
+
+def lab_to_rgb(lab):
+    """Convert an ``(N, 3)`` array of CIE L*a*b* colors to sRGB, clipped to
+    the range 0 to 1.
+    """
+    lab = np.asarray(lab, dtype=float)
+    fy = (lab[:, 0] + 16) / 116.0
+    f = np.column_stack((fy + lab[:, 1] / 500.0, fy, fy - lab[:, 2] / 200.0))
+    xyz = np.where(f ** 3 > _EPSILON, f ** 3, (116 * f - 16) / _KAPPA)
+    linear = np.clip(xyz.dot(_XYZ_TO_RGB.T), 0, 1)
+    return np.where(linear <= 0.0031308, linear * 12.92,
+                    1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def _in_lab(func):
+    """Make a transform from *func*, which modifies an array of L*a*b*
+    colors in place.
+    """
+    def transform(rgb):
+        lab = rgb_to_lab(rgb)
+        func(lab)
+        return lab_to_rgb(lab)
+    return transform
+
+
+def compose(*transforms):
+    """Chain *transforms* together, applying them from left to right.
+    """
+    def transform(rgb):
+        for t in transforms:
+            rgb = t(rgb)
+        return rgb
+    return transform
+
+
+def darken(amount):
+    """Reduce lightness by the fraction *amount*.
+    """
+    def func(lab):
+        lab[:, 0] *= 1 - amount
+    return _in_lab(func)
+
+
+def lighten(amount):
+    """Move lightness towards white by the fraction *amount*.
+    """
+    def func(lab):
+        lab[:, 0] += (100 - lab[:, 0]) * amount
+    return _in_lab(func)
+
+
+def desaturate(amount):
+    """Reduce chroma by the fraction *amount*.
+    """
+    def func(lab):
+        lab[:, 1:] *= 1 - amount
+    return _in_lab(func)
+
+
+def hue_rotate(degrees):
+    """Rotate hues by *degrees*, keeping lightness and chroma.
+    """
+    theta = np.radians(degrees)
+    rotation = np.array([[np.cos(theta), -np.sin(theta)],
+                         [np.sin(theta), np.cos(theta)]])
+
+    def func(lab):
+        lab[:, 1:] = lab[:, 1:].dot(rotation.T)
+    return _in_lab(func)
+
+
+def contrast(factor):
+    """Scale the distance of each color's lightness from the midpoint by
+    *factor*; values above 1 increase contrast.
+    """
+    def func(lab):
+        lab[:, 0] = np.clip(50 + (lab[:, 0] - 50) * factor, 0, 100)
+    return _in_lab(func)
+
+
+def invert_lightness():
+    """Swap light and dark, keeping hues, e.g. to make a dark variant of a
+    light style.
+    """
+    def func(lab):
+        lab[:, 0] = 100 - lab[:, 0]
+    return _in_lab(func)
+
+
+#: Named transforms for generating common variants.
+PRESETS = {
+    'darker': darken(0.25),
+    'lighter': lighten(0.25),
+    'desaturated': desaturate(0.6),
+    'grayscale': desaturate(1.0),
+    'high-contrast': contrast(1.5),
+    'inverted': invert_lightness(),
+    'hue-120': hue_rotate(120),
+    'hue-240': hue_rotate(240),
+}
+
+
+class _StyleColors(object):
+    """All of the distinct colors used by a style, as one array, with enough
+    information to build new styles with the colors replaced.
+    """
+    def __init__(self, style):
+        self.style = style
+        self.background = normalise_color(style.background_color)
+        self.highlight = normalise_color(style.highlight_color)
+
+        colors = set([self.background, self.highlight])
+        for ts in style.pygout_styles.itervalues():
+            colors.update(getattr(ts, a) for a in COLOR_ATTRS)
+        colors.discard(None)
+        self.colors = sorted(colors)
+        self.rgb = np.array([color_to_rgb(c) for c in self.colors],
+                            dtype=float).reshape(-1, 3) / 255.0
+
+    def create_style(self, rgb, name):
+        """Create a style with each color replaced by the corresponding row
+        of *rgb*.
+        """
+        values = np.rint(np.clip(rgb, 0, 1) * 255).astype(int)
+        mapping = dict((old, '#%02x%02x%02x' % tuple(new))
+                       for old, new in zip(self.colors, values))
+        mapping[None] = None
+
+        styles = {}
+        for token, ts in self.style.pygout_styles.iteritems():
+            new = TokenStyleEditor(ts)
+            for a in COLOR_ATTRS:
+                setattr(new, a, mapping[getattr(ts, a)])
+            styles[token] = new
+        return create_style(name, styles, mapping[self.background],
+                            mapping[self.highlight])
+
+
+def transform_style(style, transform, name=None):
+    """Create a new style by applying *transform* to every color in
+    *style*.
+    """
+    colors = _StyleColors(style)
+    return colors.create_style(transform(colors.rgb),
+                               name or style.pygout_name)
+
+
+def generate_variants(style, transforms):
+    """Create a variant of *style* for each transform in *transforms*, a dict
+    mapping names to transforms, returning a dict mapping the same names to
+    styles.  The style's colors are only extracted once.
+    """
+    colors = _StyleColors(style)
+    return dict((name, colors.create_style(t(colors.rgb), name))
+                for name, t in transforms.iteritems())
@@ -1,4 +1,6 @@
+import os
 import re
+from contextlib import contextmanager
 
 
 #: Valid color regex for :func:`normalise_color`.
@@ -37,6 +39,52 @@ def normalise_color(color):
     return '#' + color.lower()
 
 
+def color_to_rgb(color):
+    """Convert a color to a tuple of red, green and blue values from 0 to 255.
+
+    >>> color_to_rgb('#ff8000')
+    (255, 128, 0)
+    """
+    color = normalise_color(color)
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def rgb_to_color(rgb):
+    """Convert red, green and blue values from 0 to 255 to a color, rounding
+    and clamping them as necessary.
+
+    >>> rgb_to_color((255, 127.6, -3))
+    '#ff8000'
+    """
+    return '#' + ''.join('{:02x}'.format(int(round(min(max(v, 0), 255))))
+                         for v in rgb)
+
+
+def color_to_lab(color):
+    """Convert a color, treated as sRGB with a D65 white point, to CIE L*a*b*
+    coordinates, in which Euclidean distance approximates perceived color
+    difference.
+
+    >>> [round(v, 1) for v in color_to_lab('#ff0000')]
+    [53.2, 80.1, 67.2]
+    """
+    def linear(c):
+        c /= 255.0
+        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+    r, g, b = [linear(c) for c in color_to_rgb(color)]
+    x = (0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / 0.95047
+    y = (0.2126729 * r + 0.7151522 * g + 0.0721750 * b)
+    z = (0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / 1.08883
+
+    def f(t):
+        return t ** (1 / 3.0) if t > 216 / 24389.0 else \
+            (24389 / 27.0 * t + 16) / 116.0
+
+    fx, fy, fz = f(x), f(y), f(z)
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+
 class ValueFilter(object):
     """A descriptor which applies *filter* to assigned values, which are stored
     at *attr*.  If the value is unset it is *default*.
@@ -54,3 +102,60 @@ class ValueFilter(object):
 
     def __set__(self, instance, value):
         setattr(instance, self.attr, self.filter(value))
+
+
+def cache_dir(*parts):
+    """Get the path of a directory within PygOut's cache directory, creating
+    it if necessary.  The cache lives in ``$PYGOUT_CACHE_DIR`` if set, or
+    ``pygout`` within ``$XDG_CACHE_HOME`` (default ``~/.cache``).
+    """
+    root = os.environ.get('PYGOUT_CACHE_DIR')
+    if not root:
+        root = os.path.join(os.environ.get('XDG_CACHE_HOME') or
+                            os.path.join(os.path.expanduser('~'), '.cache'),
+                            'pygout')
+    path = os.path.join(root, *parts)
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path)
+        except OSError:
+            # Created concurrently by another process?
+            if not os.path.isdir(path):
+                raise
+    return path
+
+
+@contextmanager
+def atomic_write(path):
+    """Open *path* for writing, as a temporary file that replaces *path* when
+    the ``with`` block ends, so that concurrent readers never see a partial
+    file.  The temporary file is removed if writing fails.
+    """
+    tmp = '{}.{}'.format(path, os.getpid())
+    try:
+        with open(tmp, 'w') as f:
+            yield f
+        os.rename(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def find_files(paths, extension=None):
+    """Get the files in *paths*, and the files below any directories in
+    *paths* (only those ending with *extension*, if given), in a consistent
+    order.
+    """
+    filenames = []
+    for path in paths:
+        if not os.path.isdir(path):
+            filenames.append(path)
+            continue
+        for dirpath, dirnames, files in os.walk(path):
+            dirnames.sort()
+            filenames.extend(os.path.join(dirpath, f) for f in sorted(files)
+                             if extension is None or f.endswith(extension))
+    return filenames
@@ -30,6 +30,10 @@ setup(
     packages = find_packages(),
     platforms = 'any',
     install_requires = INSTALL_REQUIRES,
+    extras_require = {
+        # pygout.transform
+        'transform': ['numpy'],
+    },
     entry_points = {
         'console_scripts': ['pygout = pygout.cmdline:main'],
     },
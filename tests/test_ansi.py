@@ -0,0 +1,67 @@
+import json
+from StringIO import StringIO
+
+from nose.tools import eq_
+from pygments.lexers import PythonLexer
+from pygments.token import Token
+
+from pygout.formats.ansi import Ansi, SgrTable, RESET, sgr, detect_depth
+from pygout.style import TokenStyle, TokenStyleEditor, create_style
+
+
+STYLE = create_style('test', {
+    Token: TokenStyleEditor('#000000'),
+    Token.Keyword: TokenStyleEditor('bold #ff0000'),
+    Token.String: TokenStyleEditor('italic underline #0000ff bg:#ffffff'),
+    Token.Name.Builtin: TokenStyleEditor('bold #ff0000'),
+})
+
+
+def test_sgr():
+    ts = TokenStyle('#ff0000', '#008000', None, True, False, True)
+    eq_(sgr(ts), '\x1b[0;1;4;38;2;255;0;0;48;2;0;128;0m')
+    eq_(sgr(ts, '256'), '\x1b[0;1;4;38;5;196;48;5;28m')
+    eq_(sgr(ts, '16'), '\x1b[0;1;4;91;42m')
+    plain = TokenStyle(None, None, None, False, False, False)
+    eq_(sgr(plain), RESET)
+    eq_(sgr(plain, bgcolor='#ffffff'), '\x1b[0;48;2;255;255;255m')
+
+
+def _table(depth):
+    stream = StringIO()
+    Ansi().write(stream, STYLE)
+    return stream.getvalue(), SgrTable.load(StringIO(stream.getvalue()),
+                                            depth)
+
+
+def test_table():
+    data, table = _table('truecolor')
+    data = json.loads(data)
+    eq_(data['name'], 'test')
+    # Identical styles are only stored once
+    eq_(data['tokens']['Token.Keyword'], data['tokens']['Token.Name.Builtin'])
+    eq_(len(data['styles']), 3)
+
+    eq_(table[Token.Keyword], '\x1b[0;1;38;2;255;0;0m')
+    eq_(table[Token.Keyword.Custom.Thing], table[Token.Keyword])
+    eq_(table[Token.Literal.String.Doc],
+        '\x1b[0;3;4;38;2;0;0;255;48;2;255;255;255m')
+
+
+def test_highlight():
+    code = 'def f(x):\n    return "x"\n'
+    for depth in ('truecolor', '256', '16'):
+        data, table = _table(depth)
+        output = table.format(PythonLexer().get_tokens(code))
+        assert output.endswith(RESET)
+        assert table[Token.Keyword] + 'def' in output
+        # Stripping the escape sequences leaves the code
+        for sequence in set(table.sequences.values()) | set([RESET]):
+            output = output.replace(sequence, '')
+        eq_(output, code)
+
+
+def test_detect_depth():
+    eq_(detect_depth({'COLORTERM': 'truecolor'}), 'truecolor')
+    eq_(detect_depth({'TERM': 'xterm-256color'}), '256')
+    eq_(detect_depth({'TERM': 'xterm'}), '16')
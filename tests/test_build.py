@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from nose.tools import eq_, assert_raises
+
+from pygout.build import MergeError, Job, build, make_jobs, merge, shard_of
+
+
+STYLES = ['default', 'emacs', 'monokai', 'native', 'trac']
+FORMATS = ['css', 'pygoutconfig', 'vim']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_shard_of():
+    jobs = make_jobs(STYLES, FORMATS, ['darker'])
+    eq_(len(jobs), 30)
+    assert Job('monokai', 'vim', 'darker') in jobs
+    for count in (1, 3, 7):
+        shards = [shard_of(j, count) for j in jobs]
+        assert all(1 <= s <= count for s in shards)
+        # The same every time
+        eq_(shards, [shard_of(j, count) for j in jobs])
+
+
+class TestBuild(object):
+    def setup(self):
+        self.path = tempfile.mkdtemp()
+        self.old_cache = os.environ.get('PYGOUT_CACHE_DIR')
+        os.environ['PYGOUT_CACHE_DIR'] = self._dir('cache')
+
+    def teardown(self):
+        if self.old_cache is None:
+            del os.environ['PYGOUT_CACHE_DIR']
+        else:
+            os.environ['PYGOUT_CACHE_DIR'] = self.old_cache
+        shutil.rmtree(self.path)
+
+    def _dir(self, name):
+        return os.path.join(self.path, name)
+
+    def _build_shards(self, count):
+        """Build each shard in its own process.
+        """
+        argv = [sys.executable, '-m', 'pygout.cmdline', 'build']
+        for s in STYLES:
+            argv.extend(['-S', s])
+        for f in FORMATS:
+            argv.extend(['-f', f])
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        processes = [
+            subprocess.Popen(argv + ['--shard', '{}/{}'.format(i, count),
+                                     '-o', self._dir('shard{}'.format(i))],
+                             env=env, stderr=subprocess.PIPE)
+            for i in range(1, count + 1)]
+        for p in processes:
+            p.communicate()
+            eq_(p.returncode, 0)
+        return [self._dir('shard{}'.format(i)) for i in range(1, count + 1)]
+
+    def test_merge(self):
+        jobs = make_jobs(STYLES, FORMATS)
+        expected = build(jobs, self._dir('all'))
+
+        shards = self._build_shards(3)
+        merged = merge(shards, self._dir('merged'))
+        eq_(sorted(merged['outputs']), sorted(expected['outputs']))
+        for key, entry in expected['outputs'].iteritems():
+            eq_(merged['outputs'][key]['sha256'], entry['sha256'])
+            with open(os.path.join(self._dir('merged'), entry['path'])) as f:
+                output = f.read()
+            with open(os.path.join(self._dir('all'), entry['path'])) as f:
+                eq_(output, f.read())
+
+    def test_empty_shard(self):
+        jobs = make_jobs(['default'], ['vim'])
+        shard = shard_of(jobs[0], 3) % 3 + 1
+        manifest = build(jobs, self._dir('empty'), shard, 3)
+        eq_(manifest['outputs'], {})
+        with open(os.path.join(self._dir('empty'), 'manifest.json')) as f:
+            eq_(json.load(f)['assigned'], [])
+
+    def test_merge_problems(self):
+        shards = self._build_shards(2)
+
+        # Missing shard
+        assert_raises(MergeError, merge, shards[:1], self._dir('merged'))
+        # Missing shard directory, or one without a manifest
+        os.mkdir(self._dir('empty'))
+        for missing in (self._dir('nonexistent'), self._dir('empty')):
+            try:
+                merge([shards[0], missing], self._dir('merged'))
+            except MergeError as e:
+                assert e.problems[0].startswith(missing + ': no manifest')
+            else:
+                assert False, 'missing manifest not detected'
+
+        # Conflicting outputs for the same job
+        other = self._dir('other')
+        shutil.copytree(shards[0], other)
+        with open(os.path.join(other, 'manifest.json')) as f:
+            manifest = json.load(f)
+        key, entry = sorted(manifest['outputs'].iteritems())[0]
+        with open(os.path.join(other, entry['path']), 'a') as f:
+            f.write('/* changed */\n')
+        try:
+            merge(shards + [other], self._dir('merged'))
+        except MergeError as e:
+            eq_(len(e.problems), 1)
+            assert 'does not match' in e.problems[0]
+        else:
+            assert False, 'modified output not detected'
+
+        # Consistent with its own manifest, but not the other shard's
+        with open(os.path.join(other, entry['path']), 'rb') as f:
+            entry['sha256'] = hashlib.sha256(f.read()).hexdigest()
+        with open(os.path.join(other, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        try:
+            merge(shards + [other], self._dir('merged'))
+        except MergeError as e:
+            eq_(len(e.problems), 1)
+            assert key in e.problems[0] and 'conflicts' in e.problems[0]
+        else:
+            assert False, 'conflict not detected'
+        assert not os.path.exists(self._dir('merged'))
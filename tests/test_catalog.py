@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+
+import pygments
+from nose.tools import eq_
+from pygments.styles import get_all_styles
+
+from pygout.catalog import load_catalog, snapshot
+from pygout.style import ResolvedStyle, create_style_from_pygments
+
+
+def test_styles():
+    path = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(path, 'catalog.json')
+        eq_(snapshot(filename), filename)
+        catalog = load_catalog(filename)
+    finally:
+        shutil.rmtree(path)
+    eq_(sorted(catalog), sorted(get_all_styles()))
+
+    def test(name):
+        expected = create_style_from_pygments(name)
+        style = catalog[name]
+        eq_(style.pygout_name, name)
+        eq_(style.background_color, expected.background_color)
+        eq_(dict((t, str(s)) for t, s in style.pygout_styles.iteritems()),
+            dict((t, str(s)) for t, s in expected.pygout_styles.iteritems()))
+        eq_(list(ResolvedStyle(style)), list(ResolvedStyle(expected)))
+
+    for name in ('default', 'monokai', 'emacs'):
+        yield test, name
+
+
+def test_regenerate():
+    path = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(path, 'catalog.json')
+        # Created if missing...
+        load_catalog(filename)
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        eq_(data['pygments'], pygments.__version__)
+
+        # ...and replaced if it's for another version of Pygments
+        data['pygments'] = '0.0'
+        data['styles'] = {}
+        with open(filename, 'w') as f:
+            json.dump(data, f)
+        eq_(sorted(load_catalog(filename)), sorted(get_all_styles()))
+
+        # ...or corrupt
+        with open(filename, 'w') as f:
+            f.write('{"pygments":')
+        eq_(sorted(load_catalog(filename)), sorted(get_all_styles()))
+        with open(filename, 'r') as f:
+            eq_(json.load(f)['pygments'], pygments.__version__)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_unusable_cache():
+    path = tempfile.mkdtemp()
+    old_cache = os.environ.get('PYGOUT_CACHE_DIR')
+    try:
+        # The cache directory is a file, so nothing can be written there
+        os.environ['PYGOUT_CACHE_DIR'] = os.path.join(path, 'cache')
+        open(os.path.join(path, 'cache'), 'w').close()
+        catalog = load_catalog()
+    finally:
+        if old_cache is None:
+            del os.environ['PYGOUT_CACHE_DIR']
+        else:
+            os.environ['PYGOUT_CACHE_DIR'] = old_cache
+        shutil.rmtree(path)
+    eq_(sorted(catalog), sorted(get_all_styles()))
+    eq_(list(ResolvedStyle(catalog['monokai'])),
+        list(ResolvedStyle(create_style_from_pygments('monokai'))))
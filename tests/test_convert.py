@@ -0,0 +1,96 @@
+import itertools
+from multiprocessing.pool import ThreadPool
+from StringIO import StringIO
+
+from nose.tools import eq_, raises
+
+from pygout.convert import convert, convert_iter, convert_pygments
+from pygout.style import ResolvedStyle, create_style_from_pygments
+
+
+STYLES = ['default', 'monokai', 'emacs', 'murphy', 'native', 'vim']
+FORMATS = ['css', 'pygoutconfig', 'vim']
+
+CONFIG = """
+[palette]
+fg = #fff
+
+[Token]
+color = ${palette:fg}
+
+[Keyword]
+bold = yes
+color = #f90
+"""
+
+
+def _job(job):
+    kind, source, to_format = job
+    if kind == 'pygments':
+        return convert_pygments(source, to_format)
+    else:
+        return convert(StringIO(source), 'pygoutconfig', to_format)
+
+
+def _jobs():
+    jobs = [('pygments', s, f) for s, f in itertools.product(STYLES, FORMATS)]
+    jobs.extend(('config', CONFIG, f) for f in FORMATS)
+    return jobs
+
+
+# Test that conversions in parallel threads give byte-identical output to
+# the same conversions run serially
+def test_concurrent_conversion():
+    jobs = _jobs() * 20
+    serial = [_job(j) for j in jobs]
+
+    pool = ThreadPool(16)
+    try:
+        parallel = pool.map(_job, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    for job, a, b in zip(jobs, serial, parallel):
+        eq_(a, b, 'output differs for {}'.format(job))
+
+
+@raises(AttributeError)
+def test_resolved_style_immutable():
+    resolved = ResolvedStyle(create_style_from_pygments('default'))
+    resolved.background_color = '#000000'
+
+
+def _generated_config(n):
+    """Generate a large config one line at a time."""
+    yield '[palette]\n'
+    yield 'fg = #abcdef\n'
+    for i in xrange(n):
+        yield '\n'
+        yield '[Name.Generated.T{}]\n'.format(i)
+        yield 'color = ${palette:fg}\n'
+        yield 'bold = {}\n'.format(i % 2 == 0)
+
+
+class _LineCounter(object):
+    """An output stream which only counts lines."""
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, s):
+        self.lines += s.count('\n')
+
+
+def test_convert_iter_streaming():
+    out = _LineCounter()
+    convert_iter(_generated_config(10000), 'pygoutconfig',
+                 out, 'pygoutconfig')
+    eq_(out.lines, 10000 * 4)
+
+
+def test_convert_iter_fallback():
+    # The CSS writer needs the whole style, so the pairs are collected
+    out = StringIO()
+    convert_iter(StringIO(CONFIG), 'pygoutconfig', out, 'css')
+    expected = convert(StringIO(CONFIG), 'pygoutconfig', 'css')
+    eq_(out.getvalue(), expected)
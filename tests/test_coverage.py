@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+
+from nose.tools import eq_
+from pygments.token import Token
+
+from pygout.coverage import TokenProfile
+from pygout.formats.pygoutconfig import PygOutConfig
+from pygout.formats.vim import Vim
+from pygout.style import create_style_from_pygments
+
+
+PROFILE = TokenProfile({
+    Token.Text: 10,
+    Token.Name.Function: 3,
+    Token.Name: 2,
+    Token.Literal.String.Double: 4,
+})
+
+
+def test_profile():
+    eq_(PROFILE.frequency(Token), 19)
+    eq_(PROFILE.frequency(Token.Name), 5)
+    eq_(PROFILE.frequency(Token.Name.Function), 3)
+    assert PROFILE.reachable(Token.String)
+    assert not PROFILE.reachable(Token.Keyword)
+    assert not PROFILE.reachable(Token.String.Single)
+    eq_(PROFILE.select([(Token.Keyword, 1), (Token.String, 2), (Token, 3),
+                        (Token.Name, 4), (Token.Name.Class, 5)]),
+        [(Token, 3), (Token.Name, 4), (Token.String, 2)])
+
+
+def test_build():
+    path = tempfile.mkdtemp()
+    try:
+        os.mkdir(os.path.join(path, 'sub'))
+        for filename, code in [('a.py', 'x = "a"\n'),
+                               ('sub/b.py', 'def f(): pass\n'),
+                               ('sub/c.c', 'int x;\n'),
+                               ('sub/d.unknown', 'x')]:
+            with open(os.path.join(path, filename), 'w') as f:
+                f.write(code)
+
+        profile = TokenProfile.build([path], processes=2)
+        assert profile.reachable(Token.Name.Function)
+        assert profile.reachable(Token.Keyword.Type)
+        eq_(profile.frequency(Token.Literal.String), 3)
+
+        python = TokenProfile.build([path], ['python'], processes=2)
+        assert python.reachable(Token.Name.Function)
+        assert not python.reachable(Token.Keyword.Type)
+
+        stream = StringIO()
+        python.save(stream)
+        stream.seek(0)
+        eq_(TokenProfile.load(stream).counts, python.counts)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_writers():
+    style = create_style_from_pygments('monokai')
+
+    stream = StringIO()
+    PygOutConfig(PROFILE).write(stream, style)
+    tokens = [t for t, _ in PygOutConfig().read_iter(
+        StringIO(stream.getvalue()))]
+    eq_(tokens, [Token.Text, Token.Name, Token.Literal, Token.Literal.String,
+                 Token.Name.Function])
+
+    stream = StringIO()
+    Vim(PROFILE).write(stream, style)
+    groups = [l.split()[1] for l in stream.getvalue().splitlines()
+              if l.startswith('hi ') and l.split()[1] != 'clear']
+    eq_(groups, ['Normal', 'Identifier', 'Function', 'Label', 'String'])
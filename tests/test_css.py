@@ -0,0 +1,88 @@
+from StringIO import StringIO
+
+from nose.tools import eq_
+from pygments.token import Token
+
+from pygout.convert import convert_pygments
+from pygout.formats.css import Css
+from pygout.style import TokenStyleEditor, create_style
+
+
+STYLE = create_style('test', {
+    Token: TokenStyleEditor('#000'),
+    Token.Keyword: TokenStyleEditor('bold #f00'),
+    Token.Keyword.Type: TokenStyleEditor('nobold'),
+    Token.String: TokenStyleEditor('bold #f00'),
+    Token.Comment: TokenStyleEditor('italic bg:#f00'),
+}, bgcolor='#fff', hlcolor='#eee')
+
+
+def _write(style, **kwargs):
+    stream = StringIO()
+    Css(**kwargs).write(stream, style)
+    return stream.getvalue().splitlines()
+
+
+def _rule(lines, cls):
+    """Find the rule for the class *cls*."""
+    for line in lines:
+        if '.highlight .{},'.format(cls) in line + ',':
+            return line
+        if '.highlight .{} {{'.format(cls) in line:
+            return line
+
+
+def test_grouping():
+    lines = _write(STYLE)
+    eq_(lines[0], '.highlight { background: #ffffff; color: #000000 }')
+    eq_(lines[1], '.highlight .hll { background-color: #eeeeee }')
+    # Keyword and String (and their children) share a rule
+    rule = _rule(lines, 'k')
+    assert rule is _rule(lines, 's')
+    assert rule is _rule(lines, 'kd')
+    assert rule.endswith('{ color: #ff0000; font-weight: bold }')
+    # Keyword.Type is different
+    eq_(_rule(lines, 'kt'), '.highlight .kt { color: #ff0000 }')
+    # Each class appears only once
+    selectors = [s for l in lines for s in l.split(' {')[0].split(', ')]
+    eq_(len(selectors), len(set(selectors)))
+
+
+def test_text():
+    # Token.Text has no class of its own, so its color goes in the base rule
+    lines = convert_pygments('monokai', 'css').splitlines()
+    eq_(lines[0], '.highlight { background: #272822; color: #f8f8f2 }')
+
+
+def test_variables():
+    lines = _write(STYLE, variables=True)
+    # Most frequently used first; everything inherits Token's color
+    eq_(lines[0], '.highlight { --pygout-color-0: #000000; '
+                  '--pygout-color-1: #ff0000; '
+                  'background: #ffffff; color: var(--pygout-color-0) }')
+    eq_(_rule(lines, 'kt'), '.highlight .kt { color: var(--pygout-color-1) }')
+    assert _rule(lines, 'c').endswith(
+            '{ color: var(--pygout-color-0); font-style: italic; '
+            'background-color: var(--pygout-color-1) }')
+
+
+def test_changed_only():
+    lines = _write(STYLE, changed_only=True)
+    assert _rule(lines, 'k') is not None
+    # Properties set by .k are reset, not left to apply through it
+    assert 'font-weight: normal' in _rule(lines, 'kt')
+    assert 'color: #ff0000' in _rule(lines, 'kt')
+    eq_(_rule(lines, 'kd'), None)
+    eq_(_rule(lines, 'c1'), None)
+
+
+def test_changed_only_order():
+    style = create_style('test', {
+        Token: TokenStyleEditor('bold #000'),
+        Token.Comment: TokenStyleEditor('nobold #f00'),
+        Token.Keyword: TokenStyleEditor('bold #f00'),
+        Token.Keyword.Type: TokenStyleEditor('nobold'),
+    })
+    lines = _write(style, changed_only=True)
+    # .kt has the same declarations as .c, but must still override .k
+    assert lines.index(_rule(lines, 'k')) < lines.index(_rule(lines, 'kt'))
@@ -0,0 +1,113 @@
+from StringIO import StringIO
+
+from nose.tools import eq_
+from pygments.token import Token
+
+from pygout.diff import diff_styles, styles_equivalent
+from pygout.formats.css import Css
+from pygout.formats.vim import Vim
+from pygout.style import TokenStyleEditor, create_style
+from pygout.style import create_style_from_pygments
+
+
+def _style(styles, bgcolor='#ffffff'):
+    return create_style('test', dict((t, TokenStyleEditor(s))
+                                     for t, s in styles.iteritems()),
+                        bgcolor=bgcolor)
+
+
+OLD = _style({
+    Token: '#000',
+    Token.Name: 'bold #00f',
+    Token.Name.Constant: '#f00',
+    Token.String: 'italic',
+})
+
+
+def test_equivalent():
+    # The same effective styles, defined differently
+    new = _style({
+        Token: '#000000',
+        Token.Name: 'bold #0000ff',
+        Token.Name.Constant: '#ff0000 bold',
+        Token.Name.Class: 'bold',
+        Token.String: 'italic #000',
+    })
+    assert styles_equivalent(OLD, new)
+    assert not diff_styles(OLD, new)
+
+    def test(name):
+        style = create_style_from_pygments(name)
+        assert styles_equivalent(style, create_style(
+            name, style.pygout_styles, style.background_color,
+            style.highlight_color))
+
+    # Not styles with 3-digit colors, which Pygments expands incorrectly
+    for name in ('monokai', 'native', 'trac'):
+        yield test, name
+
+
+def test_diff():
+    new = _style({
+        Token: '#000',
+        Token.Name: '#00f',
+        Token.Name.Constant: 'bold #f00',
+        Token.String: 'italic',
+    }, bgcolor='#eeeeee')
+    diff = diff_styles(OLD, new)
+    assert diff
+    assert diff.background
+    assert not diff.highlight
+    assert Token.Name in diff.tokens
+    assert Token.Name.Builtin in diff.tokens
+    assert Token.Name.Constant not in diff.tokens
+    assert Token.String not in diff.tokens
+    assert diff.changed(Token.Name.Builtin.Custom)
+
+
+def test_vim_patch():
+    new = _style({
+        Token: '#000',
+        Token.Name: '#00f',
+        Token.Name.Constant: '#f00',
+        Token.String: 'italic',
+    })
+    stream = StringIO()
+    Vim().write_patch(stream, new, diff_styles(OLD, new))
+    lines = [l for l in stream.getvalue().splitlines()
+             if l.startswith('hi ')]
+    # Only Name's groups and Constant, which inherited bold from Name
+    eq_(sorted(l.split()[1] for l in lines),
+        ['Constant', 'Function', 'Identifier', 'Label'])
+    # Removed attributes are explicitly reset
+    assert 'gui=NONE' in lines[0]
+    assert 'guifg=#0000ff' in lines[0]
+
+
+def test_vim_patch_normal():
+    # Token changes, but the background doesn't
+    old = _style({Token: '#000'}, bgcolor='#202020')
+    new = _style({Token: '#111'}, bgcolor='#202020')
+    stream = StringIO()
+    Vim().write_patch(stream, new, diff_styles(old, new))
+    lines = [l for l in stream.getvalue().splitlines()
+             if l.startswith('hi Normal ')]
+    eq_(len(lines), 1)
+    assert 'guifg=#111111' in lines[0]
+    assert 'guibg=#202020' in lines[0]
+
+
+def test_css_patch():
+    new = _style({
+        Token: '#000',
+        Token.Name: 'bold #00f',
+        Token.Name.Constant: '#f00',
+        Token.String: '',
+    })
+    stream = StringIO()
+    Css().write_patch(stream, new, diff_styles(OLD, new))
+    lines = stream.getvalue().splitlines()
+    eq_(len(lines), 1)
+    assert lines[0].startswith('.highlight .s, ')
+    assert '.highlight .s1, ' in lines[0]
+    assert 'font-style: normal' in lines[0]
@@ -0,0 +1,79 @@
+import random
+
+from nose.tools import eq_
+from pygments.token import Token
+
+from pygout.model import StyleModel
+from pygout.style import ResolvedStyle, TokenStyleEditor
+from pygout.style import create_style_from_pygments
+
+
+def _check_consistent(model):
+    """Check the model against a style built from scratch."""
+    resolved = ResolvedStyle(model.to_style())
+    for token, tokenstyle in resolved:
+        eq_(model.resolve(token), tokenstyle, str(token))
+
+
+def test_initial_resolution():
+    def test(name):
+        _check_consistent(StyleModel.from_style(
+            create_style_from_pygments(name)))
+
+    for name in ('default', 'monokai', 'emacs'):
+        yield test, name
+
+
+def test_notifications():
+    model = StyleModel(styles={
+        Token: TokenStyleEditor('#000'),
+        Token.Name: TokenStyleEditor('#111'),
+        Token.Name.Builtin: TokenStyleEditor('noinherit italic'),
+        Token.Name.Function: TokenStyleEditor('#222'),
+    })
+    notified = []
+    model.subscribe(lambda m, tokens: notified.append(tokens))
+
+    changed = model.update(Token.Name, bold=True)
+    eq_(notified, [changed])
+    assert Token.Name in changed
+    assert Token.Name.Class in changed
+    # Children with their own color still change because of bold
+    assert Token.Name.Function in changed
+    # Stop at noinherit boundaries
+    assert Token.Name.Builtin not in changed
+    assert Token.Name.Builtin.Pseudo not in changed
+    assert Token.Keyword not in changed
+
+    # Only tokens that inherit the color are affected
+    changed = model.update(Token.Name, color='#333')
+    assert Token.Name.Class in changed
+    assert Token.Name.Function not in changed
+
+    # Editing the base token reaches noinherit tokens too
+    changed = model.update(Token, color='#444')
+    assert Token.Name.Builtin.Pseudo in changed
+    assert Token.Name.Class not in changed
+
+    # Nothing changed, no notification
+    del notified[:]
+    eq_(model.update(Token.Name, color='#333'), [])
+    eq_(notified, [])
+    _check_consistent(model)
+
+
+def test_random_edits():
+    rng = random.Random(42)
+    model = StyleModel.from_style(create_style_from_pygments('monokai'))
+    model.resolve(Token.Name.Builtin.Custom.Thing)
+    tokens = sorted(model._resolved)
+    styles = ['', 'noinherit', 'bold #f00', 'nobold bg:#0f0',
+              'italic border:#00f', 'noinherit underline #abc']
+    for i in xrange(200):
+        token = rng.choice(tokens)
+        style = rng.choice(styles + [None])
+        before = dict((t, model.resolve(t)) for t in tokens)
+        changed = model.set(token, style)
+        # Exactly the tokens whose resolved style changed are reported
+        eq_(changed, [t for t in tokens if model.resolve(t) != before[t]])
+    _check_consistent(model)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_
+
+from pygout import preview
+
+
+class TestPreview(object):
+    def setup(self):
+        self.cache = tempfile.mkdtemp()
+        self.old_cache = os.environ.get('PYGOUT_CACHE_DIR')
+        os.environ['PYGOUT_CACHE_DIR'] = self.cache
+
+    def teardown(self):
+        if self.old_cache is None:
+            del os.environ['PYGOUT_CACHE_DIR']
+        else:
+            os.environ['PYGOUT_CACHE_DIR'] = self.old_cache
+        shutil.rmtree(self.cache)
+
+    def test_lex_cache(self):
+        lexer, code = preview.DEFAULT_SAMPLE
+        tokens = preview.lex(code, lexer)
+        eq_(len(os.listdir(os.path.join(self.cache, 'tokens'))), 1)
+        cached = preview.lex(code, lexer)
+        eq_(cached, tokens)
+        # Tokens come back as the real token types
+        assert all(a[0] is b[0] for a, b in zip(tokens, cached))
+        eq_(''.join(text for _, text in cached), code)
+
+    def test_contact_sheet(self):
+        styles = ['default', 'monokai', 'emacs']
+        samples = [preview.DEFAULT_SAMPLE, ('c', 'int main() { return 0; }')]
+        for format in ('html', 'ansi'):
+            sheet = preview.contact_sheet(styles, samples, format,
+                                          processes=2)
+            for name in styles:
+                assert name in sheet
+                for output in preview.render_style(
+                        name, [preview.lex(c, l) for l, c in samples],
+                        format):
+                    assert output in sheet
+
+    def test_render_html(self):
+        lexer, code = preview.DEFAULT_SAMPLE
+        html, = preview.render_style('monokai', [preview.lex(code, lexer)])
+        assert html.startswith('<pre style="background: #272822')
+        # Keywords
+        assert '<span style="color: #66d9ef">class</span>' in html
@@ -0,0 +1,208 @@
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+
+from nose.tools import eq_
+from pygments.token import Token
+
+from pygout.formats.pygoutconfig import ConfigError, PygOutConfig
+from pygout.formats.pygoutconfig import check_files
+from pygout.formats.pygoutconfig import _load_include
+from pygout.style import create_style_from_pygments, iter_style
+from pygout.util import find_files
+
+
+CONFIG = """
+[palette]
+fg = #fff
+
+[String]
+color = #f00
+
+[Token]
+color = ${palette:fg}
+bgcolor = #000
+
+[Keyword.Type]
+bold = yes
+inherit = no
+color = ${bgcolor}
+bgcolor = #123
+"""
+
+
+def test_read_iter():
+    eq_([(t, str(s)) for t, s in PygOutConfig().read_iter(StringIO(CONFIG))],
+        [(Token.String, '#ff0000'),
+         (Token, '#ffffff bg:#000000'),
+         (Token.Keyword.Type, 'noinherit bold #112233 bg:#112233')])
+
+
+# Test that streaming and non-streaming reading and writing agree
+def test_streaming_identity():
+    def test(name):
+        style = create_style_from_pygments(name)
+        fmt = PygOutConfig()
+        stream = StringIO()
+        fmt.write(stream, style)
+        written = stream.getvalue()
+
+        stream = StringIO()
+        fmt.write_iter(stream, fmt.read_iter(StringIO(written)))
+        eq_(stream.getvalue(), written)
+
+        style = fmt.read(StringIO(written))
+        eq_([(t, str(s)) for t, s in iter_style(style)],
+            [(t, str(s)) for t, s in fmt.read_iter(StringIO(written))])
+
+    for name in ('default', 'monokai', 'murphy'):
+        yield test, name
+
+
+BAD_CONFIG = """
+[palette]
+fg = #fff
+
+[Token]
+color = ${palette:fg}
+bold = maybe
+
+[String]
+color = #ff
+colour = #f00
+
+[Keyword]
+bgcolor = ${palette:missing}
+
+[Name.count]
+color = #f00
+
+[Name.bad name]
+color = #f00
+"""
+
+
+def test_validate():
+    eq_(PygOutConfig().validate(StringIO(CONFIG)), [])
+    # Every error is found, not just the first
+    errors = PygOutConfig().validate(StringIO(BAD_CONFIG), path='bad.cfg')
+    eq_([e[:3] for e in errors], [('bad.cfg', 'Token', 'bold'),
+                                  ('bad.cfg', 'String', 'color'),
+                                  ('bad.cfg', 'String', 'colour'),
+                                  ('bad.cfg', 'Keyword', 'bgcolor'),
+                                  ('bad.cfg', 'Name.count', None),
+                                  ('bad.cfg', 'Name.bad name', None)])
+    eq_(errors[-1].message, 'invalid token name')
+    # Parse errors stop checking
+    errors = PygOutConfig().validate(StringIO('[Token]\ncolor = #fff\n'
+                                              '[Token]\n'))
+    eq_(errors, [ConfigError(None, 'Token', None, errors[0].message)])
+
+
+def test_invalid_token_name():
+    for name in ('Name.count', 'Name..Builtin', 'Name.bad name'):
+        config = '[{}]\ncolor = #f00\n'.format(name)
+        for read in (PygOutConfig().read,
+                     lambda s: list(PygOutConfig().read_iter(s))):
+            try:
+                read(StringIO(config))
+            except ValueError as e:
+                assert 'invalid token name' in str(e)
+            else:
+                assert False, 'invalid token name not detected'
+
+
+def test_check_files():
+    path = tempfile.mkdtemp()
+    try:
+        os.mkdir(os.path.join(path, 'sub'))
+        for filename, content in [('a.cfg', CONFIG),
+                                  ('sub/b.cfg', BAD_CONFIG),
+                                  ('sub/c.txt', BAD_CONFIG),
+                                  ('sub/d.cfg', '[Token]\ncolor = #f00\n')]:
+            with open(os.path.join(path, filename), 'w') as f:
+                f.write(content)
+
+        filenames = find_files([path], '.cfg')
+        eq_(filenames, [os.path.join(path, 'a.cfg'),
+                        os.path.join(path, 'sub', 'b.cfg'),
+                        os.path.join(path, 'sub', 'd.cfg')])
+        for resolve in (True, False):
+            errors = check_files(filenames, resolve, processes=2)
+            eq_(set(e.path for e in errors),
+                set([os.path.join(path, 'sub', 'b.cfg')]))
+            eq_(len(errors), 6)
+    finally:
+        shutil.rmtree(path)
+
+
+class TestIncludes(object):
+    FILES = {
+        'palette.cfg': '[palette]\nfg = #111\nbg = #222\n',
+        'base/base.cfg': ('[pygout]\npalette = ../palette.cfg\n\n'
+                          '[Token]\ncolor = ${palette:fg}\n\n'
+                          '[Comment]\nitalic = yes\ncolor = #333\n'),
+        'theme.cfg': ('[pygout]\ninclude = base/base.cfg\n\n'
+                      '[palette]\nfg = #444\n\n'
+                      '[Comment]\ncolor = ${palette:bg}\n'),
+        'colors.cfg': ('[pygout]\npalette = base/base.cfg\n\n'
+                       '[String]\ncolor = ${palette:fg}\n'),
+        'cycle1.cfg': '[pygout]\ninclude = cycle2.cfg\n',
+        'cycle2.cfg': '[pygout]\npalette = cycle1.cfg\n',
+    }
+
+    def setup(self):
+        self.path = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.path, 'base'))
+        for filename, content in self.FILES.iteritems():
+            with open(self._file(filename), 'w') as f:
+                f.write(content)
+
+    def teardown(self):
+        shutil.rmtree(self.path)
+
+    def _file(self, filename):
+        return os.path.join(self.path, filename)
+
+    def _read(self, filename):
+        with open(self._file(filename), 'r') as f:
+            return dict((t, str(s)) for t, s in
+                        iter_style(PygOutConfig().read(f)))
+
+    def _read_iter(self, filename):
+        with open(self._file(filename), 'r') as f:
+            return dict((t, str(s)) for t, s in PygOutConfig().read_iter(f))
+
+    def test_include(self):
+        for read in (self._read, self._read_iter):
+            eq_(read('theme.cfg'), {
+                Token: '#444444',
+                Token.Comment: 'italic #222222',
+            })
+
+    def test_palette(self):
+        # Only the palette of base.cfg, not its token sections
+        for read in (self._read, self._read_iter):
+            eq_(read('colors.cfg'), {Token.String: '#111111'})
+
+    def test_cache(self):
+        sections, depends = _load_include(self._file('base/base.cfg'))
+        eq_(sorted(p for p, _ in depends),
+            [self._file('base/base.cfg'), self._file('palette.cfg')])
+        # Parsed once...
+        assert _load_include(self._file('base/base.cfg'))[0] is sections
+        # ...until an included file changes
+        os.utime(self._file('palette.cfg'), (0, 0))
+        assert _load_include(self._file('base/base.cfg'))[0] is not sections
+
+    def test_cycle(self):
+        try:
+            self._read('cycle1.cfg')
+        except ValueError as e:
+            assert 'include cycle' in str(e)
+        else:
+            assert False, 'include cycle not detected'
+        with open(self._file('cycle2.cfg'), 'r') as f:
+            errors = PygOutConfig().validate(f)
+        eq_([e.section for e in errors], ['pygout'])
@@ -0,0 +1,85 @@
+import math
+import os
+import random
+import tempfile
+
+from nose.tools import eq_
+from pygments.token import Token
+
+from pygout.search import KDTree, StyleIndex, DARK_LIGHTNESS, style_vector
+from pygout.style import TokenStyleEditor, create_style
+from pygout.style import create_style_from_pygments
+from pygout.util import color_to_lab
+
+
+# Test that the k-d tree agrees with brute force
+def test_kdtree():
+    rng = random.Random(1)
+
+    def test(dims, k):
+        points = [tuple(rng.uniform(-100, 100) for _ in range(dims))
+                  for _ in range(300)]
+        tree = KDTree(points)
+        accept = lambda i: i % 3 != 0
+        for _ in range(20):
+            q = tuple(rng.uniform(-100, 100) for _ in range(dims))
+            expected = sorted(
+                (math.sqrt(sum((a - b) ** 2 for a, b in zip(q, p))), i)
+                for i, p in enumerate(points) if accept(i))[:k]
+            eq_(tree.nearest(q, k, accept), expected)
+
+    for dims, k in [(3, 1), (3, 5), (6, 3), (30, 4)]:
+        yield test, dims, k
+
+
+def test_style_vector():
+    # monokai only sets Token.Text's color
+    vector = style_vector(create_style_from_pygments('monokai'))
+    eq_(vector[1], color_to_lab('#f8f8f2'))
+    # Missing colors depend on the background
+    dark = create_style('dark', {}, bgcolor='#000')
+    eq_(style_vector(dark)[1], color_to_lab('#fff'))
+    light = create_style('light', {}, bgcolor='#fff')
+    eq_(style_vector(light)[1], color_to_lab('#000'))
+
+
+def _index():
+    return StyleIndex.build(dict(
+        (n, create_style_from_pygments(n))
+        for n in ('default', 'monokai', 'native', 'emacs', 'vim')))
+
+
+def test_search():
+    index = _index()
+    eq_(index.similar(create_style_from_pygments('native'), 1)[0],
+        (0.0, 'native'))
+
+    # Keyword color from monokai
+    results = index.search({Token.Keyword: '#66d9ef'}, 'dark', k=10)
+    eq_(results[0], (0.0, 'monokai'))
+    for d, name in results:
+        bg = index.vectors[index.names.index(name)][0]
+        assert bg[0] < DARK_LIGHTNESS
+
+    results = index.search({Token.Keyword: '#66d9ef'}, 'light', k=10)
+    assert 'monokai' not in [n for d, n in results]
+
+    # A slightly modified copy of a style is most similar to the original
+    styles = dict(create_style_from_pygments('emacs').pygout_styles)
+    styles[Token.Keyword] = TokenStyleEditor('bold #00aa00')
+    custom = create_style('custom', styles, bgcolor='#f8f8f8')
+    eq_(index.similar(custom, 1)[0][1], 'emacs')
+
+
+def test_save_load():
+    index = _index()
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        index.save(path)
+        loaded = StyleIndex.load(path)
+    finally:
+        os.unlink(path)
+    eq_(loaded.names, index.names)
+    eq_(loaded.search({Token.String: '#f00'}, '#fff'),
+        index.search({Token.String: '#f00'}, '#fff'))
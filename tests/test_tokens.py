@@ -0,0 +1,66 @@
+import random
+import threading
+
+from nose.tools import eq_
+from pygments.token import STANDARD_TYPES, Token, string_to_tokentype
+
+from pygout.tokens import TokenRegistry
+
+
+NAMES = ['', 'Token', 'Name', 'Token.Name.Builtin', 'String.Double',
+         'Literal.String.Double', 'Name.Builtin.Pseudo.Ours.A',
+         'Name.Builtin.Pseudo.Ours.B.C', 'Keyword.Ours']
+
+
+def test_get():
+    registry = TokenRegistry()
+    for name in NAMES:
+        assert registry.get(name) is string_to_tokentype(name), name
+        # Cached the second time
+        assert registry.get(name) is string_to_tokentype(name), name
+
+
+def test_nodes():
+    registry = TokenRegistry()
+    token = registry.get('Name.Builtin.Pseudo.Ours.A')
+    node = registry.node(token)
+    eq_(node.depth, 5)
+    eq_(list(node.ancestors), list(reversed(token.split())))
+    assert node.parent is registry.node(token.parent)
+    eq_(registry.node(Token).ancestors, (Token,))
+    eq_(registry.ancestors(Token.String), (Token.String, Token.Literal, Token))
+
+
+def test_sort():
+    registry = TokenRegistry()
+    tokens = list(STANDARD_TYPES) + [registry.get(n) for n in NAMES]
+    tokens.extend(Token.Name.Ours.__getattr__('T{}'.format(i))
+                  for i in range(20))
+    random.shuffle(tokens)
+    eq_(registry.sort(tokens), sorted(tokens))
+    # New tokens are ordered once registered
+    tokens.append(Token.Comment.Ours)
+    eq_(registry.sort(tokens), sorted(tokens))
+
+
+def test_threads():
+    registry = TokenRegistry()
+    tokens = [Token.Ours.__getattr__('T{}'.format(i)).Child
+              for i in range(200)]
+    errors = []
+
+    def work(part):
+        try:
+            for t in part:
+                eq_(registry.ancestors(t), tuple(reversed(t.split())))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(tokens[i::4],))
+               for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    eq_(errors, [])
+    eq_(registry.sort(tokens), sorted(tokens))
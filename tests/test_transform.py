@@ -0,0 +1,67 @@
+from nose.plugins.skip import SkipTest
+from nose.tools import eq_
+from pygments.token import Token
+
+try:
+    import numpy as np
+except ImportError:
+    raise SkipTest('NumPy is not installed')
+
+from pygout import transform
+from pygout.style import TokenStyleEditor, create_style
+from pygout.style import create_style_from_pygments, iter_style
+from pygout.util import color_to_lab
+
+
+STYLE = create_style('test', {
+    Token: TokenStyleEditor('#808080 bg:#ffffff'),
+    Token.Keyword: TokenStyleEditor('bold #ff0000 border:#0000ff'),
+    Token.Comment: TokenStyleEditor('noinherit italic'),
+}, bgcolor='#ffffff', hlcolor='#ffff00')
+
+
+def test_lab_roundtrip():
+    rgb = np.random.RandomState(0).rand(500, 3)
+    assert np.allclose(transform.lab_to_rgb(transform.rgb_to_lab(rgb)), rgb)
+    for color in ('#ff0000', '#123456', '#ffffff'):
+        rgb = np.array([[int(color[i:i + 2], 16) / 255.0 for i in (1, 3, 5)]])
+        assert np.allclose(transform.rgb_to_lab(rgb)[0], color_to_lab(color))
+
+
+def test_identity():
+    style = transform.transform_style(STYLE, transform.compose())
+    eq_([(t, str(s)) for t, s in iter_style(style)],
+        [(t, str(s)) for t, s in iter_style(STYLE)])
+    eq_(style.background_color, '#ffffff')
+    eq_(style.highlight_color, '#ffff00')
+
+
+def test_transforms():
+    style = transform.transform_style(STYLE, transform.PRESETS['grayscale'])
+    for token, ts in iter_style(style):
+        for attr in transform.COLOR_ATTRS:
+            color = getattr(ts, attr)
+            if color is not None:
+                eq_(color[1:3] * 3, color[1:])
+    # Non-color attributes are kept
+    eq_(str(style.pygout_styles[Token.Comment]), 'noinherit italic')
+
+    style = transform.transform_style(STYLE, transform.darken(0.5), 'dark')
+    eq_(style.pygout_name, 'dark')
+    assert (color_to_lab(style.background_color)[0] <
+            color_to_lab(STYLE.background_color)[0])
+
+    # Composition applies each in turn (using a color which stays in gamut)
+    rgb = np.array([[0.6, 0.5, 0.5]])
+    rotated = transform.compose(transform.hue_rotate(90),
+                                transform.hue_rotate(-90))(rgb)
+    assert np.allclose(rotated, rgb)
+
+
+def test_variants():
+    style = create_style_from_pygments('monokai')
+    variants = transform.generate_variants(style, transform.PRESETS)
+    eq_(sorted(variants), sorted(transform.PRESETS))
+    for name, variant in variants.iteritems():
+        eq_(variant.pygout_name, name)
+        eq_(sorted(variant.pygout_styles), sorted(style.pygout_styles))
@@ -0,0 +1,27 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_, assert_raises
+
+from pygout.util import atomic_write
+
+
+def test_atomic_write():
+    path = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(path, 'data')
+        with atomic_write(filename) as f:
+            f.write('old')
+
+        def fail():
+            with atomic_write(filename) as f:
+                f.write('new')
+                raise ValueError('failed')
+        assert_raises(ValueError, fail)
+        # The old file is untouched, and the temporary file is gone
+        eq_(os.listdir(path), ['data'])
+        with open(filename) as f:
+            eq_(f.read(), 'old')
+    finally:
+        shutil.rmtree(path)
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+
+from nose.tools import eq_
+from pygments.token import Token
+
+from pygout.formats.vim import Vim, TOKEN_MAP, read_directory
+from pygout.style import create_style_from_pygments
+
+
+SCHEME = """
+" A test colorscheme
+set background=dark
+hi clear
+let g:colors_name = "test"
+
+hi Normal guifg=#ffffff guibg=#101010
+hi Identifier guifg=#00ff00 gui=bold  " trailing comment
+hi Constant guifg=#ff0000
+hi link Float Special
+hi Special guifg=#0000ff gui=italic,underline
+hi Number guifg=Red
+hi clear Number
+"""
+
+
+def _read(text):
+    return Vim().read(StringIO(text))
+
+
+def test_read_scheme():
+    style = _read(SCHEME)
+    eq_(style.pygout_name, 'test')
+    eq_(style.background_color, '#101010')
+
+    expected = {
+        Token: '#ffffff',
+        Token.Name: 'bold #00ff00',
+        Token.Name.Constant: '#ff0000',
+        # Number was cleared, so falls back to Vim's default link
+        Token.Number: '#ff0000',
+        Token.String: '#ff0000',
+        Token.Number.Float: 'italic underline #0000ff',
+    }
+    for token, s in expected.iteritems():
+        eq_(str(style.pygout_styles[token]).replace('nobold ', '')
+                                           .replace('noitalic ', '')
+                                           .replace('nounderline ', ''), s)
+
+
+def test_read_background_default():
+    style = _read('set background=light\nhi String guifg=#123456\n')
+    eq_(style.background_color, '#ffffff')
+    eq_(style.pygout_styles.keys(), [Token.String])
+
+
+# Test that reading back what Vim.write produces preserves the mapped tokens
+def test_read_written():
+    def test(name):
+        original = create_style_from_pygments(name)
+        stream = StringIO()
+        Vim().write(stream, original)
+        style = _read(stream.getvalue())
+        eq_(style.background_color, original.background_color)
+        for token, groups in TOKEN_MAP:
+            a = original.find_style_for_token(token)
+            b = style.find_style_for_token(token)
+            for k in ('color', 'bgcolor', 'border'):
+                if token is not Token or k != 'bgcolor':
+                    # Pygments doesn't normalise case
+                    eq_((a[k] or '').lower(), b[k] or '',
+                        '{} {} {}'.format(name, token, k))
+
+    for name in ('default', 'monokai', 'emacs'):
+        yield test, name
+
+
+def test_read_directory():
+    path = tempfile.mkdtemp()
+    try:
+        os.mkdir(os.path.join(path, 'sub'))
+        for i, filename in enumerate(['a.vim', 'sub/b.vim', 'c.txt']):
+            with open(os.path.join(path, filename), 'w') as f:
+                f.write('let g:colors_name="s{}"\n'.format(i))
+                f.write('hi Normal guifg=#00000{}\n'.format(i))
+
+        styles = read_directory(path, processes=2)
+        eq_(sorted(styles.keys()), [os.path.join(path, 'a.vim'),
+                                    os.path.join(path, 'sub', 'b.vim')])
+        style = styles[os.path.join(path, 'sub', 'b.vim')]
+        eq_(style.pygout_name, 's1')
+        eq_(style.pygout_styles[Token].color, '#000001')
+    finally:
+        shutil.rmtree(path)